@@ -0,0 +1,212 @@
+"""
+Values sorted by date, for time-range queries.
+
+DateIndex keeps values sorted by a date read off each value (date_of), in
+blocks of at most `block_size` entries. Each block holds an array of integer
+epoch microseconds next to its values, and the largest key of every block is
+kept apart.
+Finding a date is a bisect over the block maxima and one within a block, so:
+
+    add / discard           O(log n + block_size), in any date order
+    between                 O(log n) to start, then O(1) per value yielded
+    count_between           O(log n + n / block_size)
+
+Range queries return iterators that walk the blocks in place; nothing is
+copied, and changing the index while iterating raises RuntimeError.
+
+Naive datetimes are read as UTC, aware ones are converted to UTC, so one
+index should hold one kind.
+
+Used by OrderStore (order_store.py) and by misc/todo.py's DueDateIndex.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Callable, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_BLOCK_SIZE = 1024
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def epoch_micros(moment: datetime) -> int:
+    """Return the exact number of microseconds since 1970-01-01 UTC (naive datetimes read as UTC)."""
+    if moment.utcoffset() is not None:
+        delta = moment - _EPOCH_UTC
+    else:
+        delta = moment - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+class DateIndex(Generic[T]):
+    """
+    Values sorted by date; values with equal dates keep insertion order.
+
+    A value's date must not change while it is indexed.
+
+    Attributes:
+        date_of: Returns the date a value is indexed under
+        block_size: Entries per block before it is split in two
+    """
+
+    def __init__(self, date_of: Callable[[T], datetime],
+                 block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        if block_size < 2:
+            raise ValueError(f"Block size must be at least 2, got {block_size}")
+        self.date_of = date_of
+        self.block_size = block_size
+        self._keys: List[array] = []
+        self._values: List[List[T]] = []
+        self._maxes: List[int] = []
+        self._len = 0
+        self._version = 0
+
+    def add(self, value: T) -> None:
+        """Insert one value at its place in date order."""
+        key = epoch_micros(self.date_of(value))
+        maxes = self._maxes
+        if not maxes:
+            self._keys.append(array("q", [key]))
+            self._values.append([value])
+            maxes.append(key)
+        else:
+            # First block whose largest key is past this one; after the end, the last block
+            block = min(bisect_right(maxes, key), len(maxes) - 1)
+            keys = self._keys[block]
+            position = bisect_right(keys, key)
+            keys.insert(position, key)
+            self._values[block].insert(position, value)
+            maxes[block] = keys[-1]
+            if len(keys) > self.block_size:
+                self._split(block)
+        self._len += 1
+        self._version += 1
+
+    def add_many(self, values: Iterable[T]) -> None:
+        """
+        Insert many values.
+
+        Into an empty index the batch is sorted once and cut into half-full
+        blocks; otherwise each value is inserted in turn.
+        """
+        if self._len:
+            for value in values:
+                self.add(value)
+            return
+        values = list(values)
+        if not values:
+            return
+        keys = [epoch_micros(moment) for moment in map(self.date_of, values)]
+        ranks = sorted(range(len(values)), key=keys.__getitem__)
+        keys = array("q", map(keys.__getitem__, ranks))
+        values = list(map(values.__getitem__, ranks))
+        step = self.block_size // 2
+        for start in range(0, len(values), step):
+            self._keys.append(keys[start:start + step])
+            self._values.append(values[start:start + step])
+            self._maxes.append(self._keys[-1][-1])
+        self._len = len(values)
+        self._version += 1
+
+    def discard(self, value: T) -> bool:
+        """Remove this very value (compared by identity); False if it is not indexed."""
+        key = epoch_micros(self.date_of(value))
+        block = bisect_left(self._maxes, key)
+        # Values with the same date may span blocks; look through all of them.
+        while block < len(self._maxes):
+            keys, values = self._keys[block], self._values[block]
+            position = bisect_left(keys, key)
+            while position < len(keys) and keys[position] == key:
+                if values[position] is value:
+                    del keys[position]
+                    del values[position]
+                    if keys:
+                        self._maxes[block] = keys[-1]
+                    else:
+                        del self._keys[block], self._values[block], self._maxes[block]
+                    self._len -= 1
+                    self._version += 1
+                    return True
+                position += 1
+            if position < len(keys):
+                break
+            block += 1
+        return False
+
+    def _split(self, block: int) -> None:
+        """Split an overfull block into two halves."""
+        keys = self._keys[block]
+        values = self._values[block]
+        half = len(keys) // 2
+        self._keys.insert(block + 1, keys[half:])
+        self._values.insert(block + 1, values[half:])
+        del keys[half:]
+        del values[half:]
+        self._maxes.insert(block, keys[-1])
+
+    def _locate(self, key: int) -> Tuple[int, int]:
+        """Return (block, position) of the first entry with a key >= key."""
+        block = bisect_left(self._maxes, key)
+        if block == len(self._maxes):
+            return block, 0
+        return block, bisect_left(self._keys[block], key)
+
+    def _bounds(self, start: Optional[datetime], end: Optional[datetime]) -> Tuple[int, int, int, int]:
+        first_block, first = (0, 0) if start is None else self._locate(epoch_micros(start))
+        last_block, last = ((len(self._maxes), 0) if end is None
+                            else self._locate(epoch_micros(end)))
+        return first_block, first, last_block, last
+
+    def between(self, start: Optional[datetime] = None,
+                end: Optional[datetime] = None) -> Iterator[T]:
+        """
+        Stream the values dated in [start, end), in date order.
+
+        Args:
+            start: Inclusive lower bound, or None for the earliest value
+            end: Exclusive upper bound, or None for the latest value
+
+        Yields:
+            Values, walked in place
+
+        Raises:
+            RuntimeError: If the index changes during iteration
+        """
+        first_block, first, last_block, last = self._bounds(start, end)
+        version = self._version
+        blocks = self._values
+        for block in range(first_block, min(last_block + 1, len(blocks))):
+            values = blocks[block]
+            stop = last if block == last_block else len(values)
+            for position in range(first if block == first_block else 0, stop):
+                yield values[position]
+                if self._version != version:
+                    raise RuntimeError("DateIndex changed during iteration")
+
+    def count_between(self, start: Optional[datetime] = None,
+                      end: Optional[datetime] = None) -> int:
+        """Count the values dated in [start, end) without visiting them."""
+        first_block, first, last_block, last = self._bounds(start, end)
+        if (first_block, first) >= (last_block, last):
+            return 0
+        return sum(map(len, islice(self._keys, first_block, last_block))) - first + last
+
+    def earliest(self) -> Optional[T]:
+        """Return the first value in date order, or None if the index is empty."""
+        return self._values[0][0] if self._values else None
+
+    def latest(self) -> Optional[T]:
+        """Return the last value in date order, or None if the index is empty."""
+        return self._values[-1][-1] if self._values else None
+
+    def __iter__(self) -> Iterator[T]:
+        """Stream every value in date order."""
+        return self.between()
+
+    def __len__(self) -> int:
+        return self._len
@@ -0,0 +1,277 @@
+"""
+Parallel analytics over streams of Order objects.
+
+OrderStats holds mergeable aggregates: revenue per customer, quantity and
+revenue per product, and revenue per day. A stream is cut into chunks that
+are aggregated in a process pool, and the partial OrderStats coming back are
+merged in the parent:
+
+    stats = analyze_orders(ingest_orders("orders.csv"), workers=8)
+    stats.top_products(10, by="revenue")
+
+When the input is already split into files, analyze_files() lets every
+worker read its own file, so nothing but the small partials crosses process
+boundaries.
+
+Partials keep complete counters rather than per-worker top-K lists: a
+product that ranks 11th in every shard can still be first overall, so only
+full counters merge exactly. They grow with the number of distinct
+customers, products and days, not with the number of orders; top-K queries
+run over them with a bounded heap.
+"""
+
+import heapq
+import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from dataclass import Order
+from order_ingest import DEFAULT_CHUNK_SIZE, chunked, ingest_orders
+
+DEFAULT_ANALYTICS_CHUNK_SIZE = 10 * DEFAULT_CHUNK_SIZE
+RANKINGS = ("quantity", "revenue")
+
+
+@dataclass
+class OrderStats:
+    """
+    Aggregates over a set of orders. Two OrderStats over disjoint orders
+    merge into the aggregates over both.
+
+    Revenue values are what Order.get_total_amount() and OrderItem.get_total()
+    return, summed.
+    """
+    order_count: int = 0
+    customer_revenue: Counter = field(default_factory=Counter)
+    product_quantity: Counter = field(default_factory=Counter)
+    product_revenue: Counter = field(default_factory=Counter)
+    daily_revenue: Counter = field(default_factory=Counter)
+
+    def add(self, order: Order) -> None:
+        """Fold one order into the aggregates."""
+        product_quantity = self.product_quantity
+        product_revenue = self.product_revenue
+        order_total = 0
+        for item in order.items:
+            line_total = item.get_total()
+            product_quantity[item.product_id] += item.quantity
+            product_revenue[item.product_id] += line_total
+            order_total += line_total
+        self.customer_revenue[order.customer_id] += order_total
+        self.daily_revenue[order.order_date.date()] += order_total
+        self.order_count += 1
+
+    def update(self, orders: Iterable[Order]) -> "OrderStats":
+        """Fold many orders into the aggregates; returns self."""
+        add = self.add
+        for order in orders:
+            add(order)
+        return self
+
+    def merge(self, other: "OrderStats") -> "OrderStats":
+        """Add another partial's aggregates to this one; returns self."""
+        self.order_count += other.order_count
+        self.customer_revenue.update(other.customer_revenue)
+        self.product_quantity.update(other.product_quantity)
+        self.product_revenue.update(other.product_revenue)
+        self.daily_revenue.update(other.daily_revenue)
+        return self
+
+    def top_products(self, k: int, by: str = "quantity") -> List[Tuple[str, object]]:
+        """
+        Rank products by units sold or by revenue.
+
+        Args:
+            k: Number of products to return
+            by: "quantity" or "revenue"
+
+        Returns:
+            Up to k (product_id, value) pairs, largest first; ties keep the
+            order in which products were first seen
+        """
+        if by not in RANKINGS:
+            raise ValueError(f"Unknown ranking {by!r}, expected one of {RANKINGS}")
+        counter = self.product_quantity if by == "quantity" else self.product_revenue
+        return heapq.nlargest(k, counter.items(), key=lambda pair: pair[1])
+
+    def top_customers(self, k: int) -> List[Tuple[str, object]]:
+        """Return up to k (customer_id, revenue) pairs, largest first."""
+        return heapq.nlargest(k, self.customer_revenue.items(), key=lambda pair: pair[1])
+
+    def daily_totals(self) -> List[Tuple[date, object]]:
+        """Return (day, revenue) pairs in date order."""
+        return sorted(self.daily_revenue.items())
+
+
+def _aggregate_chunk(orders: List[Order]) -> OrderStats:
+    """Worker entry point: aggregate one chunk of orders."""
+    return OrderStats().update(orders)
+
+
+def _aggregate_file(path: str, format: Optional[str] = None) -> OrderStats:
+    """Worker entry point: stream one export file and aggregate it."""
+    return OrderStats().update(ingest_orders(path, format))
+
+
+def analyze_orders(orders: Iterable[Order], workers: Optional[int] = None,
+                   chunk_size: int = DEFAULT_ANALYTICS_CHUNK_SIZE) -> OrderStats:
+    """
+    Aggregate an order stream in a process pool.
+
+    Chunks are handed out as workers free up, with at most two chunks per
+    worker in flight, so the stream is consumed at the pool's pace and
+    memory stays bounded. Every chunk is pickled to its worker, which costs
+    more than aggregating it; prefer analyze_files() when the orders come
+    from files, and use this when the stream is produced in this process by
+    something expensive enough to keep up with the pool.
+
+    Args:
+        orders: Orders to aggregate, e.g. from ingest_orders
+        workers: Worker processes (defaults to the CPU count); 1 aggregates
+            in this process
+        chunk_size: Orders sent to a worker at a time
+
+    Returns:
+        The merged aggregates
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"Worker count must be at least 1, got {workers}")
+    if workers == 1:
+        return OrderStats().update(orders)
+
+    total = OrderStats()
+    pending: Set[Future] = set()
+    with ProcessPoolExecutor(workers) as pool:
+        for chunk in chunked(orders, chunk_size):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+            pending.add(pool.submit(_aggregate_chunk, chunk))
+        for future in pending:
+            total.merge(future.result())
+    return total
+
+
+def analyze_files(paths: Sequence[str], workers: Optional[int] = None,
+                  format: Optional[str] = None) -> OrderStats:
+    """
+    Aggregate several export files, one file per worker task.
+
+    Args:
+        paths: CSV or JSONL exports (see ingest_orders)
+        workers: Worker processes (defaults to the CPU count, capped at the
+            number of files); 1 aggregates in this process
+        format: Export format for all files; guessed per file if omitted
+
+    Returns:
+        The merged aggregates
+    """
+    workers = min(workers or os.cpu_count() or 1, max(len(paths), 1))
+    if workers == 1:
+        total = OrderStats()
+        for path in paths:
+            total.merge(_aggregate_file(path, format))
+        return total
+
+    total = OrderStats()
+    with ProcessPoolExecutor(workers) as pool:
+        for partial in pool.map(_aggregate_file, paths, [format] * len(paths)):
+            total.merge(partial)
+    return total
+
+
+def synthetic_orders(count: int, seed: int = 0, customers: int = 50_000,
+                     products: int = 5_000, days: int = 90) -> Iterable[Order]:
+    """
+    Generate reproducible random orders for benchmarks.
+
+    Product popularity is skewed so top-K rankings are meaningful.
+
+    Args:
+        count: Number of orders
+        seed: Random seed
+        customers: Distinct customer ids
+        products: Distinct product ids
+        days: Distinct order days, counted back from 2026-10-18
+
+    Yields:
+        Orders with one to eight items each
+    """
+    import decimal
+    import random
+    from datetime import datetime, timedelta
+
+    from dataclass import OrderItem
+
+    rng = random.Random(seed)
+    catalog = [(f"P{i}", decimal.Decimal(rng.randint(99, 99_999)).scaleb(-2)) for i in range(products)]
+    weights = [1 / (rank + 1) for rank in range(products)]
+    start = datetime(2026, 10, 18)
+    dates = [start - timedelta(days=day) for day in range(days)]
+    for i in range(count):
+        lines = rng.choices(catalog, weights, k=rng.randint(1, 8))
+        yield Order(
+            f"ORD{seed}-{i}",
+            f"CUST{rng.randrange(customers)}",
+            [OrderItem(product_id, rng.randint(1, 5), price) for product_id, price in lines],
+            rng.choice(dates),
+        )
+
+
+def main() -> None:
+    """Benchmark sequential against parallel aggregation on synthetic orders."""
+    import csv
+    import tempfile
+    import time
+
+    order_count = 200_000
+    workers = os.cpu_count() or 1
+    orders = list(synthetic_orders(order_count, seed=1))
+    print(f"{order_count:,} orders, {workers} CPU(s)")
+
+    timings = {}
+    results = {}
+    for label, pool_size in (("in-memory, 1 worker", 1), (f"in-memory, {max(workers, 2)} workers", max(workers, 2))):
+        start = time.perf_counter()
+        results[label] = analyze_orders(orders, workers=pool_size)
+        timings[label] = time.perf_counter() - start
+
+    shard_count = max(workers, 2)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for shard in range(shard_count):
+            path = os.path.join(directory, f"orders-{shard}.csv")
+            with open(path, "w", newline="", encoding="utf-8") as fp:
+                writer = csv.writer(fp)
+                writer.writerow(["order_id", "customer_id", "product_id", "quantity",
+                                 "price", "order_date"])
+                for order in orders[shard::shard_count]:
+                    for item in order.items:
+                        writer.writerow([order.order_id, order.customer_id, item.product_id,
+                                         item.quantity, item.price, order.order_date.isoformat()])
+            paths.append(path)
+
+        for label, pool_size in (("files, 1 worker", 1), (f"files, {shard_count} workers", shard_count)):
+            start = time.perf_counter()
+            results[label] = analyze_files(paths, workers=pool_size)
+            timings[label] = time.perf_counter() - start
+
+    baseline = OrderStats().update(orders)
+    for label, elapsed in timings.items():
+        assert results[label] == baseline, label
+        print(f"{label + ':':<26} {elapsed:.2f}s (matches sequential)")
+
+    print("Top products by quantity:", baseline.top_products(3))
+    print("Top products by revenue: ", baseline.top_products(3, by="revenue"))
+    print("Top customers:           ", baseline.top_customers(3))
+    first_day, first_total = baseline.daily_totals()[0]
+    print(f"Daily totals: {len(baseline.daily_revenue)} days, first {first_day} ${first_total}")
+
+
+if __name__ == "__main__":
+    main()
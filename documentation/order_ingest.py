@@ -0,0 +1,379 @@
+"""
+Streaming ingestion of order exports into Order / OrderItem objects.
+
+Every stage is a generator, so a CSV or JSONL export of any size flows
+through in bounded memory:
+
+    rows = read_csv_rows("orders.csv")            # (line number, dict) per row
+    lines = parse_lines(rows)                      # validated OrderLine
+    orders = group_orders(lines)                   # Order per order_id
+    for batch in chunked(prefetch(orders), 1000):  # lists of Orders
+        ...
+
+Consumers pull, so a slow consumer simply stops the parser. prefetch() moves
+parsing to a background thread behind a bounded queue, which blocks the
+producer when the consumer falls behind.
+
+Each expected column is a field of OrderLine: order_id, customer_id,
+product_id, quantity, price, and optionally order_date (ISO 8601) and
+shipping_address.
+"""
+
+import csv
+import decimal
+import json
+import queue
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, TypeVar, Union
+
+from dataclass import Order, OrderItem
+
+T = TypeVar("T")
+Source = Union[str, TextIO]
+# A raw row and the file line it was read from
+NumberedRow = Tuple[int, Dict[str, object]]
+
+REQUIRED_FIELDS = ("order_id", "customer_id", "product_id", "quantity", "price")
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_PREFETCH = 10_000
+
+
+class IngestError(ValueError):
+    """Raised when an input line cannot be turned into an order line."""
+
+    def __init__(self, line_number: int, message: str) -> None:
+        self.line_number = line_number
+        super().__init__(f"line {line_number}: {message}")
+
+
+@dataclass(frozen=True)
+class OrderLine:
+    """One validated line of an order export."""
+    line_number: int
+    order_id: str
+    customer_id: str
+    product_id: str
+    quantity: int
+    price: decimal.Decimal
+    order_date: Optional[datetime] = None
+    shipping_address: Optional[str] = None
+
+
+def _open(source: Source) -> TextIO:
+    return open(source, newline="", encoding="utf-8") if isinstance(source, str) else source
+
+
+def read_csv_rows(source: Source) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Yield (line number, dict) per CSV data row; the first row holds the column names.
+
+    The line number is the file line the row ends on, which is also where it
+    starts unless a quoted field spans several lines.
+    """
+    stream = _open(source)
+    try:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    finally:
+        if stream is not source:
+            stream.close()
+
+
+def read_jsonl_rows(source: Source) -> Iterator[NumberedRow]:
+    """Yield (line number, dict) per non-blank JSONL line."""
+    stream = _open(source)
+    try:
+        for line_number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise IngestError(line_number, f"invalid JSON: {e}") from e
+    finally:
+        if stream is not source:
+            stream.close()
+
+
+def parse_line(row: Dict[str, object], line_number: int) -> OrderLine:
+    """
+    Validate one raw row.
+
+    Raises:
+        IngestError: If the row is not an object, or a field is missing or
+            malformed
+    """
+    # A JSONL line can hold any JSON value, not only an object
+    if not isinstance(row, dict):
+        raise IngestError(line_number, f"expected a JSON object, got {type(row).__name__}")
+    missing = [name for name in REQUIRED_FIELDS if row.get(name) in (None, "")]
+    if missing:
+        raise IngestError(line_number, f"missing {', '.join(missing)}")
+
+    value = row["quantity"]
+    try:
+        # int() would truncate a JSON 2.9 to 2 and accept true as 1
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise ValueError(value)
+        quantity = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise IngestError(line_number, f"quantity is not an integer: {row['quantity']!r}") from None
+    if quantity < 1:
+        raise IngestError(line_number, f"quantity must be at least 1, got {quantity}")
+
+    try:
+        # str() first so JSON floats keep their written digits
+        price = decimal.Decimal(str(row["price"]))
+    except decimal.InvalidOperation:
+        raise IngestError(line_number, f"price is not a number: {row['price']!r}") from None
+    if not price.is_finite() or price < 0:
+        raise IngestError(line_number, f"price must be a non-negative amount, got {price}")
+
+    order_date = None
+    if row.get("order_date"):
+        try:
+            order_date = datetime.fromisoformat(str(row["order_date"]))
+        except ValueError:
+            raise IngestError(line_number, f"order_date is not ISO 8601: {row['order_date']!r}") from None
+
+    return OrderLine(
+        line_number=line_number,
+        order_id=str(row["order_id"]),
+        customer_id=str(row["customer_id"]),
+        product_id=str(row["product_id"]),
+        quantity=quantity,
+        price=price,
+        order_date=order_date,
+        shipping_address=str(row["shipping_address"]) if row.get("shipping_address") else None,
+    )
+
+
+def parse_lines(rows: Iterable[NumberedRow],
+                on_error: Optional[Callable[[IngestError], None]] = None) -> Iterator[OrderLine]:
+    """
+    Validate rows lazily.
+
+    Args:
+        rows: (line number, raw row) pairs, e.g. from read_csv_rows or
+            read_jsonl_rows
+        on_error: Called with each bad row's error, which is then skipped;
+            without it the first bad row raises
+
+    Yields:
+        Validated order lines
+    """
+    for line_number, row in rows:
+        try:
+            yield parse_line(row, line_number)
+        except IngestError as e:
+            if on_error is None:
+                raise
+            on_error(e)
+
+
+class _OpenOrder:
+    __slots__ = ("first", "items")
+
+    def __init__(self, first: OrderLine) -> None:
+        self.first = first
+        self.items: List[OrderItem] = []
+
+    def to_order(self) -> Order:
+        first = self.first
+        if first.order_date is None:
+            return Order(first.order_id, first.customer_id, self.items,
+                         shipping_address=first.shipping_address)
+        return Order(first.order_id, first.customer_id, self.items,
+                     first.order_date, first.shipping_address)
+
+
+def group_orders(lines: Iterable[OrderLine], max_open_orders: int = 1) -> Iterator[Order]:
+    """
+    Group order lines into Order objects.
+
+    At most `max_open_orders` orders are assembled at once; when another
+    order starts, the least recently started one is emitted. With the default
+    of 1 the input must list each order's lines together; a larger window
+    tolerates lines of a few orders being interleaved.
+
+    Raises:
+        IngestError: If an order's lines disagree on the customer, or an
+            order reappears after it was emitted while still in the window
+            of recently emitted ids
+
+    Yields:
+        One Order per order_id, in the order the orders were started
+    """
+    if max_open_orders < 1:
+        raise ValueError(f"max_open_orders must be at least 1, got {max_open_orders}")
+    open_orders: "OrderedDict[str, _OpenOrder]" = OrderedDict()
+    # Recently emitted ids, to catch orders split across the window
+    emitted: "OrderedDict[str, None]" = OrderedDict()
+
+    for line in lines:
+        current = open_orders.get(line.order_id)
+        if current is None:
+            if line.order_id in emitted:
+                raise IngestError(line.line_number,
+                                  f"order {line.order_id} continues after it was completed")
+            if len(open_orders) >= max_open_orders:
+                order_id, finished = open_orders.popitem(last=False)
+                emitted[order_id] = None
+                if len(emitted) > max_open_orders:
+                    emitted.popitem(last=False)
+                yield finished.to_order()
+            current = open_orders[line.order_id] = _OpenOrder(line)
+        elif line.customer_id != current.first.customer_id:
+            raise IngestError(line.line_number,
+                              f"order {line.order_id} changes customer from "
+                              f"{current.first.customer_id} to {line.customer_id}")
+        current.items.append(OrderItem(line.product_id, line.quantity, line.price))
+
+    for finished in open_orders.values():
+        yield finished.to_order()
+
+
+def chunked(iterable: Iterable[T], size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[T]]:
+    """Yield lists of up to `size` consecutive elements."""
+    if size < 1:
+        raise ValueError(f"Chunk size must be at least 1, got {size}")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+_DONE = object()
+
+
+def prefetch(iterable: Iterable[T], maxsize: int = DEFAULT_PREFETCH) -> Iterator[T]:
+    """
+    Run an iterable in a background thread, buffering at most `maxsize` items.
+
+    The producer blocks when the buffer is full, so memory stays bounded
+    however slow the consumer is. Exceptions raised by the producer are
+    re-raised in the consumer. Closing the generator early stops the producer.
+    """
+    buffer: "queue.Queue[object]" = queue.Queue(maxsize)
+    stop = threading.Event()
+    failure: List[BaseException] = []
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                while not stop.is_set():
+                    try:
+                        buffer.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            while not stop.is_set():
+                try:
+                    buffer.put(_DONE, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    producer = threading.Thread(target=produce, name="order-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                break
+            yield item  # type: ignore[misc]
+    finally:
+        stop.set()
+        producer.join()
+    if failure:
+        raise failure[0]
+
+
+def ingest_orders(source: Source, file_format: Optional[str] = None,
+                  on_error: Optional[Callable[[IngestError], None]] = None,
+                  max_open_orders: int = 1) -> Iterator[Order]:
+    """
+    Stream Orders out of a CSV or JSONL export.
+
+    Args:
+        source: File path or open text file
+        file_format: "csv" or "jsonl"; guessed from the file extension if omitted
+        on_error: Handler for bad rows (see parse_lines)
+        max_open_orders: Grouping window (see group_orders)
+
+    Yields:
+        Orders, one at a time
+    """
+    if file_format is None:
+        name = source if isinstance(source, str) else getattr(source, "name", "")
+        file_format = "jsonl" if str(name).endswith((".jsonl", ".ndjson")) else "csv"
+    if file_format == "csv":
+        rows: Iterable[NumberedRow] = read_csv_rows(source)
+    elif file_format == "jsonl":
+        rows = read_jsonl_rows(source)
+    else:
+        raise ValueError(f"Unsupported format {file_format!r}, expected 'csv' or 'jsonl'")
+    return group_orders(parse_lines(rows, on_error), max_open_orders)
+
+
+def main() -> None:
+    """Stream a generated export through the pipeline and report peak memory."""
+    import os
+    import random
+    import tempfile
+    import time
+    import tracemalloc
+
+    rng = random.Random(7)
+    line_count = 200_000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "orders.csv")
+        with open(path, "w", newline="", encoding="utf-8") as fp:
+            writer = csv.writer(fp)
+            writer.writerow(["order_id", "customer_id", "product_id", "quantity",
+                             "price", "order_date", "shipping_address"])
+            order = 0
+            for _ in range(line_count):
+                if rng.random() < 0.3:
+                    order += 1
+                writer.writerow([f"ORD{order}", f"CUST{order % 5000}", f"P{rng.randrange(2000)}",
+                                 rng.randint(1, 5), f"{rng.randint(100, 99999) / 100:.2f}",
+                                 "2026-10-18T12:00:00", ""])
+
+        def consume() -> tuple:
+            order_count = 0
+            revenue = decimal.Decimal(0)
+            for batch in chunked(prefetch(ingest_orders(path)), DEFAULT_CHUNK_SIZE):
+                order_count += len(batch)
+                revenue += sum(order.get_total_amount() for order in batch)
+            return order_count, revenue
+
+        start = time.perf_counter()
+        order_count, revenue = consume()
+        elapsed = time.perf_counter() - start
+
+        # Second pass under tracemalloc, which slows everything down
+        tracemalloc.start()
+        consume()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"{line_count:,} lines -> {order_count:,} orders in {elapsed:.2f}s")
+        print(f"Revenue: ${revenue}")
+        print(f"Peak traced memory: {peak / 2**20:.1f} MiB "
+              f"(file: {os.path.getsize(path) / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
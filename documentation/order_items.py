@@ -0,0 +1,175 @@
+"""
+Compact storage for large numbers of order lines.
+
+An OrderItem costs an instance with its __dict__ plus its own product id
+string and Decimal. Leaner forms for when millions of lines are held at once:
+
+- OrderLinePool: shares one product id string and one Decimal per distinct
+  value between the lines of one batch or loader; it is an ordinary object,
+  so its tables go away with it rather than growing for the process lifetime;
+- SlimOrderItem: a slotted drop-in with the same fields and get_total(),
+  built through a pool (OrderLinePool.slim_item) to share ids and prices;
+- OrderItemColumns: an array-backed table of lines storing, per line, a
+  product number, a quantity and a price number into its own tables of the
+  distinct product ids and prices, i.e. 16 bytes a line.
+
+Prices are shared by their exact Decimal representation, so Decimal("4.5")
+and Decimal("4.50") stay distinct and totals keep their exponent.
+"""
+
+import decimal
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from dataclass import OrderItem
+
+
+@dataclass(slots=True)
+class SlimOrderItem:
+    """OrderItem without a per-instance __dict__."""
+    product_id: str
+    quantity: int
+    price: decimal.Decimal
+
+    def get_total(self) -> decimal.Decimal:
+        return self.price * self.quantity
+
+
+class OrderLinePool:
+    """
+    Shared product ids and prices for the lines of one batch.
+
+    Keep one pool per loader or batch and drop it with the batch; the pool
+    holds every distinct id and price it has seen.
+    """
+
+    def __init__(self) -> None:
+        self._product_ids: Dict[str, str] = {}
+        self._prices: Dict[str, decimal.Decimal] = {}
+
+    def product_id(self, product_id: str) -> str:
+        """Return the shared string equal to product_id."""
+        return self._product_ids.setdefault(product_id, product_id)
+
+    def price(self, price: decimal.Decimal) -> decimal.Decimal:
+        """Return the shared Decimal equal to price, with the same exponent."""
+        return self._prices.setdefault(str(price), price)
+
+    def order_item(self, product_id: str, quantity: int, price: decimal.Decimal) -> OrderItem:
+        """Build an OrderItem whose id and price are shared through this pool."""
+        return OrderItem(self.product_id(product_id), quantity, self.price(price))
+
+    def slim_item(self, product_id: str, quantity: int, price: decimal.Decimal) -> SlimOrderItem:
+        """Build a SlimOrderItem whose id and price are shared through this pool."""
+        return SlimOrderItem(self.product_id(product_id), quantity, self.price(price))
+
+    def __len__(self) -> int:
+        return len(self._product_ids) + len(self._prices)
+
+
+class OrderItemColumns:
+    """
+    Order lines as parallel arrays.
+
+    Lines are appended and read back by position; indexing materializes an
+    OrderItem, so the table can stand in for a list of them when reading.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, int, decimal.Decimal]] = ()) -> None:
+        self.product_ids: List[str] = []
+        self.prices: List[decimal.Decimal] = []
+        self._product_numbers: Dict[str, int] = {}
+        self._price_numbers: Dict[str, int] = {}
+        self._products = array("I")
+        self._quantities = array("q")
+        self._price_refs = array("I")
+        self.extend(items)
+
+    def append(self, product_id: str, quantity: int, price: decimal.Decimal) -> None:
+        """Add one line."""
+        product = self._product_numbers.get(product_id)
+        if product is None:
+            product = self._product_numbers[product_id] = len(self.product_ids)
+            self.product_ids.append(product_id)
+        price_key = str(price)
+        price_ref = self._price_numbers.get(price_key)
+        if price_ref is None:
+            price_ref = self._price_numbers[price_key] = len(self.prices)
+            self.prices.append(price)
+        self._products.append(product)
+        self._quantities.append(quantity)
+        self._price_refs.append(price_ref)
+
+    def extend(self, items: Iterable[Tuple[str, int, decimal.Decimal]]) -> None:
+        """Add (product_id, quantity, price) lines."""
+        append = self.append
+        for product_id, quantity, price in items:
+            append(product_id, quantity, price)
+
+    def get_total(self, index: int) -> decimal.Decimal:
+        """Return price * quantity of one line, as OrderItem.get_total() would."""
+        return self.prices[self._price_refs[index]] * self._quantities[index]
+
+    def __getitem__(self, index: int) -> OrderItem:
+        return OrderItem(self.product_ids[self._products[index]], self._quantities[index],
+                         self.prices[self._price_refs[index]])
+
+    def __iter__(self) -> Iterator[OrderItem]:
+        product_ids, prices = self.product_ids, self.prices
+        for product, quantity, price_ref in zip(self._products, self._quantities, self._price_refs):
+            yield OrderItem(product_ids[product], quantity, prices[price_ref])
+
+    def __len__(self) -> int:
+        return len(self._quantities)
+
+
+def main() -> None:
+    """Measure the memory held per order line by each representation."""
+    import argparse
+    import gc
+    import time
+    import tracemalloc
+    from typing import Callable
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--lines", type=int, default=10_000_000, help="order lines to build")
+    parser.add_argument("--products", type=int, default=5_000, help="distinct product ids")
+    args = parser.parse_args()
+
+    prices = ["4.50", "9.99", "19.99", "29.99", "999.99", "0.125", "12"]
+    line_count, product_count = args.lines, args.products
+
+    def lines() -> Iterator[Tuple[str, int, decimal.Decimal]]:
+        # Fresh strings and Decimals per line, as a parser produces them
+        for i in range(line_count):
+            yield (f"P{i * 7919 % product_count}", 1 + i % 5,
+                   decimal.Decimal(prices[i % len(prices)]))
+
+    def each(make: Callable[..., object]) -> List[object]:
+        return [make(*line) for line in lines()]
+
+    # Each pooled row builds with a pool of its own, so nothing carries over between rows
+    builders: Dict[str, Callable[[], object]] = {
+        "OrderItem": lambda: each(OrderItem),
+        "OrderItem, pooled": lambda: each(OrderLinePool().order_item),
+        "SlimOrderItem, pooled": lambda: each(OrderLinePool().slim_item),
+        "OrderItemColumns": lambda: OrderItemColumns(lines()),
+    }
+
+    print(f"{line_count:,} lines, {product_count:,} products, {len(prices)} prices")
+    for label, build in builders.items():
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - start
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del result
+        print(f"{label:<24} {used / 2**20:>9.1f} MiB {used / line_count:>7.1f} B/line "
+              f"(built in {elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Orders indexed by order_date for time-range queries.
+
+OrderStore keeps orders sorted by date in a DateIndex (date_index.py):
+blocks of at most `block_size` entries, each holding an array of integer
+epoch microseconds next to its orders, plus the largest key of every block.
+Finding a date is a bisect over the block maxima and one within a block, so:
+
+    add                     O(log n + block_size), in any date order
+    between / since / until O(log n) to start, then O(1) per order yielded
+    count_between           O(log n + n / block_size)
+
+Range queries return iterators that walk the blocks in place; nothing is
+copied, and changing the store while iterating raises RuntimeError.
+
+Naive order dates (the default, from datetime.now) are read as UTC, aware
+ones are converted to UTC, so one store should hold one kind.
+"""
+
+from datetime import datetime
+from operator import attrgetter
+from typing import Iterable, Iterator, Optional
+
+from dataclass import Order
+from date_index import DEFAULT_BLOCK_SIZE, DateIndex
+
+
+class OrderStore:
+    """
+    Orders sorted by order_date; orders with equal dates keep insertion order.
+
+    Attributes:
+        block_size: Entries per block before it is split in two
+    """
+
+    def __init__(self, orders: Iterable[Order] = (), block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        self._index: DateIndex[Order] = DateIndex(attrgetter("order_date"), block_size)
+        self.block_size = block_size
+        self.add_many(orders)
+
+    def add(self, order: Order) -> None:
+        """Insert one order at its place in date order."""
+        self._index.add(order)
+
+    def add_many(self, orders: Iterable[Order]) -> None:
+        """
+        Insert many orders.
+
+        Into an empty store the batch is sorted once and cut into half-full
+        blocks; otherwise each order is inserted in turn.
+        """
+        self._index.add_many(orders)
+
+    def between(self, start: Optional[datetime] = None,
+                end: Optional[datetime] = None) -> Iterator[Order]:
+        """
+        Stream the orders dated in [start, end), in date order.
+
+        Args:
+            start: Inclusive lower bound, or None for the earliest order
+            end: Exclusive upper bound, or None for the latest order
+
+        Yields:
+            Orders, walked in place
+
+        Raises:
+            RuntimeError: If the store changes during iteration
+        """
+        return self._index.between(start, end)
+
+    def since(self, start: datetime) -> Iterator[Order]:
+        """Stream the orders dated at or after start."""
+        return self.between(start, None)
+
+    def until(self, end: datetime) -> Iterator[Order]:
+        """Stream the orders dated before end."""
+        return self.between(None, end)
+
+    def count_between(self, start: Optional[datetime] = None,
+                      end: Optional[datetime] = None) -> int:
+        """Count the orders dated in [start, end) without visiting them."""
+        return self._index.count_between(start, end)
+
+    def earliest(self) -> Optional[Order]:
+        """Return the first order in date order, or None if the store is empty."""
+        return self._index.earliest()
+
+    def latest(self) -> Optional[Order]:
+        """Return the last order in date order, or None if the store is empty."""
+        return self._index.latest()
+
+    def __iter__(self) -> Iterator[Order]:
+        """Stream every order in date order."""
+        return self.between()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+def main() -> None:
+    """Load orders out of date order, then compare range queries with a full scan."""
+    import random
+    import time
+    from datetime import timedelta
+
+    rng = random.Random(11)
+    order_count = 500_000
+    year_start = datetime(2026, 1, 1)
+    orders = [
+        Order(f"ORD{i}", f"CUST{i % 10_000}", [],
+              year_start + timedelta(seconds=rng.randrange(365 * 86_400)))
+        for i in range(order_count)
+    ]
+
+    start = time.perf_counter()
+    store = OrderStore()
+    for order in orders:
+        store.add(order)
+    inserted = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk = OrderStore(orders)
+    built = time.perf_counter() - start
+    assert list(store) == list(bulk)
+
+    windows = []
+    for _ in range(200):
+        window_start = year_start + timedelta(seconds=rng.randrange(365 * 86_400))
+        windows.append((window_start, window_start + timedelta(hours=rng.choice((1, 24, 24 * 7)))))
+
+    start = time.perf_counter()
+    scanned = [[order for order in orders if low <= order.order_date < high] for low, high in windows]
+    scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [list(store.between(low, high)) for low, high in windows]
+    query = time.perf_counter() - start
+
+    assert all(sorted(a, key=lambda o: o.order_date) == b for a, b in zip(scanned, indexed))
+    assert all(store.count_between(low, high) == len(result)
+               for (low, high), result in zip(windows, indexed))
+    matched = sum(map(len, indexed))
+    print(f"{order_count:,} orders")
+    print(f"Insert one at a time, random dates: {inserted:.2f}s")
+    print(f"Bulk load:                          {built:.2f}s")
+    print(f"{len(windows)} window queries ({matched:,} orders):")
+    print(f"  full scan: {scan:.2f}s")
+    print(f"  OrderStore: {query * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
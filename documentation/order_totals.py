@@ -0,0 +1,266 @@
+"""
+Batch order totals with scaled-integer arithmetic.
+
+Order.get_total_amount() sums Decimal products one OrderItem at a time. For
+end-of-day settlement over many orders, this module flattens order lines into
+a columnar buffer of integers and computes the per-order and grand totals
+with exact integer arithmetic, optionally vectorized with NumPy.
+
+Results are identical to the Decimal implementation, down to the exponent
+(Decimal("59.98") stays "59.98", not "59.980") and to the int 0 that sum()
+returns for an order without items. Orders whose totals would exceed the
+Decimal context precision, where Decimal itself would round, fall back to
+the Decimal path.
+"""
+
+import decimal
+import operator
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from dataclass import Order, OrderItem
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+Total = Union[decimal.Decimal, int]
+
+# Largest magnitude the int64 NumPy path may accumulate without overflow
+_INT64_LIMIT = 2**63 - 1
+# Context in which scaleb never rounds, for rebuilding Decimals from their parts
+_EXACT = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+
+
+def _split(price: decimal.Decimal) -> Tuple[int, int]:
+    """Split a finite Decimal into an integer coefficient and an exponent."""
+    sign, digits, exponent = price.as_tuple()
+    if not isinstance(exponent, int):
+        raise ValueError(f"Price must be a finite Decimal, got {price}")
+    coefficient = int("".join(map(str, digits))) if digits else 0
+    return (-coefficient if sign else coefficient), exponent
+
+
+def _to_decimal(coefficient: int, exponent: int) -> decimal.Decimal:
+    """Build coefficient * 10**exponent exactly, whatever the context precision."""
+    return decimal.Decimal(coefficient).scaleb(exponent, _EXACT)
+
+
+@dataclass
+class OrderLineBuffer:
+    """
+    Order lines in columnar form.
+
+    Lines of the same order are contiguous: order i owns the lines from
+    offsets[i] to offsets[i + 1]. Prices are stored as integer coefficients
+    at the buffer-wide exponent `scale`, next to each price's own exponent
+    so the original Decimal can be rebuilt. Each order remembers the exponent
+    Decimal gives its total: the smallest exponent among its prices, capped
+    at 0 because sum() starts from the int 0.
+    """
+    order_ids: List[str] = field(default_factory=list)
+    offsets: array = field(default_factory=lambda: array("q", [0]))
+    quantities: array = field(default_factory=lambda: array("q"))
+    prices: List[int] = field(default_factory=list)
+    price_exponents: array = field(default_factory=lambda: array("i"))
+    order_exponents: List[Optional[int]] = field(default_factory=list)
+    scale: int = 0
+    # Exact representation -> (coefficient, exponent); one entry per distinct price
+    _split_cache: dict = field(default_factory=dict, repr=False)
+
+    def add_order(self, order_id: str, lines: Iterable[Tuple[int, decimal.Decimal]]) -> None:
+        """Append one order given as (quantity, price) pairs."""
+        order_exponent = None
+        for quantity, price in lines:
+            # Keyed by str: Decimal("4.5") == Decimal("4.50") but their exponents differ.
+            key = str(price)
+            cached = self._split_cache.get(key)
+            if cached is None:
+                cached = self._split_cache[key] = _split(price)
+            coefficient, exponent = cached
+            if exponent < self.scale:
+                self._rescale(exponent)
+            self.quantities.append(quantity)
+            self.prices.append(coefficient * 10 ** (exponent - self.scale))
+            self.price_exponents.append(exponent)
+            if order_exponent is None:
+                order_exponent = 0
+            order_exponent = min(order_exponent, exponent)
+        self.order_ids.append(order_id)
+        self.offsets.append(len(self.quantities))
+        self.order_exponents.append(order_exponent)
+
+    def _rescale(self, exponent: int) -> None:
+        """Lower the buffer-wide exponent, rescaling the stored prices."""
+        factor = 10 ** (self.scale - exponent)
+        self.prices = [price * factor for price in self.prices]
+        self.scale = exponent
+
+    @classmethod
+    def from_orders(cls, orders: Iterable[Order]) -> "OrderLineBuffer":
+        """Flatten Order objects into a buffer."""
+        buffer = cls()
+        for order in orders:
+            buffer.add_order(order.order_id, ((item.quantity, item.price) for item in order.items))
+        return buffer
+
+    def __len__(self) -> int:
+        return len(self.order_ids)
+
+
+@dataclass
+class BatchTotals:
+    """Per-order totals, aligned with order_ids, and their grand total."""
+    order_ids: List[str]
+    totals: List[Total]
+    grand_total: Total
+
+
+def _scaled_sums_python(buffer: OrderLineBuffer) -> Tuple[List[int], List[int]]:
+    """Per-order sums of quantity * price, and of their magnitudes, at buffer.scale."""
+    products = list(map(operator.mul, buffer.quantities, buffer.prices))
+    offsets = buffer.offsets
+    sums = [sum(products[offsets[i]:offsets[i + 1]]) for i in range(len(buffer))]
+    if min(products, default=0) >= 0:
+        return sums, sums
+    magnitudes = list(map(abs, products))
+    return sums, [sum(magnitudes[offsets[i]:offsets[i + 1]]) for i in range(len(buffer))]
+
+
+def _scaled_sums_numpy(buffer: OrderLineBuffer) -> Optional[Tuple[List[int], List[int]]]:
+    """NumPy version of _scaled_sums_python; None if int64 could overflow."""
+    if not buffer.quantities:
+        return [0] * len(buffer), [0] * len(buffer)
+    quantities = np.frombuffer(buffer.quantities, dtype=np.int64)
+    max_price = max(map(abs, buffer.prices))
+    max_quantity = int(np.abs(quantities).max())
+    if max_price * max_quantity * len(quantities) > _INT64_LIMIT:
+        return None
+    products = quantities * np.array(buffer.prices, dtype=np.int64)
+    offsets = np.frombuffer(buffer.offsets, dtype=np.int64)
+    starts = offsets[:-1]
+    non_empty = starts < offsets[1:]
+    sums = np.zeros(len(buffer), dtype=np.int64)
+    magnitudes = np.zeros(len(buffer), dtype=np.int64)
+    sums[non_empty] = np.add.reduceat(products, starts[non_empty])
+    magnitudes[non_empty] = np.add.reduceat(np.abs(products), starts[non_empty])
+    return sums.tolist(), magnitudes.tolist()
+
+
+def batch_totals(source: Union[OrderLineBuffer, Sequence[Order]],
+                 use_numpy: Optional[bool] = None) -> BatchTotals:
+    """
+    Compute exact per-order totals and the grand total for many orders.
+
+    Args:
+        source: An OrderLineBuffer, or Order objects to flatten into one
+        use_numpy: Force (True) or skip (False) the NumPy path; by default it
+            is used when NumPy is installed
+
+    Returns:
+        Totals identical to Order.get_total_amount() and to summing those
+    """
+    if use_numpy and np is None:
+        raise ImportError("NumPy is required for use_numpy=True")
+    buffer = source if isinstance(source, OrderLineBuffer) else OrderLineBuffer.from_orders(source)
+    precision_limit = 10 ** decimal.getcontext().prec
+
+    scaled = None
+    if use_numpy or (use_numpy is None and np is not None):
+        scaled = _scaled_sums_numpy(buffer)
+    if scaled is None:
+        scaled = _scaled_sums_python(buffer)
+    sums, magnitudes = scaled
+
+    scale = buffer.scale
+    factors: dict = {}
+    totals: List[Total] = []
+    append = totals.append
+    exact = True
+    for i, (total, magnitude, exponent) in enumerate(zip(sums, magnitudes, buffer.order_exponents)):
+        if exponent is None:
+            append(0)  # sum() of no items is the int 0
+            continue
+        factor = factors.get(exponent)
+        if factor is None:
+            factor = factors[exponent] = 10 ** (exponent - scale)
+        if magnitude >= precision_limit * factor:
+            # Decimal would round here; reproduce it exactly by taking its path
+            append(_decimal_order_total(buffer, i))
+            exact = False
+        else:
+            append(_to_decimal(total // factor, exponent))
+
+    exponents = [exponent for exponent in buffer.order_exponents if exponent is not None]
+    if not exponents:
+        grand_total: Total = 0  # no Decimal totals at all: sum() stays the int 0
+    else:
+        grand_exponent = min(exponents)
+        factor = 10 ** (grand_exponent - scale)
+        if exact and sum(magnitudes) < precision_limit * factor:
+            grand_total = _to_decimal(sum(sums) // factor, grand_exponent)
+        else:
+            grand_total = sum(totals)
+    return BatchTotals(list(buffer.order_ids), totals, grand_total)
+
+
+def _decimal_order_total(buffer: OrderLineBuffer, order: int) -> decimal.Decimal:
+    """Total one buffered order with Decimal arithmetic, exactly as Order does."""
+    lines = range(buffer.offsets[order], buffer.offsets[order + 1])
+    return sum(
+        buffer.quantities[line] * _to_decimal(
+            buffer.prices[line] // 10 ** (buffer.price_exponents[line] - buffer.scale),
+            buffer.price_exponents[line],
+        )
+        for line in lines
+    )
+
+
+def _identical(a: Total, b: Total) -> bool:
+    """Same type, and for Decimals the same sign, digits and exponent."""
+    if type(a) is not type(b):
+        return False
+    return a.as_tuple() == b.as_tuple() if isinstance(a, decimal.Decimal) else a == b
+
+
+def main() -> None:
+    """Check batch_totals against the Decimal implementation and time both."""
+    import random
+    import time
+
+    rng = random.Random(42)
+    prices = [decimal.Decimal(p) for p in ("999.99", "29.99", "4.5", "0.125", "12", "1E+2", "-5.00")]
+    orders = [
+        Order(f"ORD{i}", f"CUST{i % 1000}",
+              [OrderItem(f"P{rng.randrange(5000)}", rng.randint(1, 5), rng.choice(prices))
+               for _ in range(rng.randint(0, 8))])
+        for i in range(200_000)
+    ]
+
+    start = time.perf_counter()
+    expected = [order.get_total_amount() for order in orders]
+    expected_grand = sum(expected)
+    reference = time.perf_counter() - start
+
+    start = time.perf_counter()
+    buffer = OrderLineBuffer.from_orders(orders)
+    flattened = time.perf_counter() - start
+
+    print(f"Decimal reference:   {reference:.2f}s")
+    print(f"Flatten to buffer:   {flattened:.2f}s")
+    for label, use_numpy in (("scaled ints", False), ("NumPy", True)):
+        if use_numpy and np is None:
+            print(f"{label + ':':<20} skipped (NumPy not installed)")
+            continue
+        start = time.perf_counter()
+        result = batch_totals(buffer, use_numpy=use_numpy)
+        elapsed = time.perf_counter() - start
+        assert all(map(_identical, result.totals, expected))
+        assert _identical(result.grand_total, expected_grand)
+        print(f"{label + ':':<20} {elapsed:.2f}s, grand total {result.grand_total} (identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+One cart workload through every cart implementation in the repo.
+
+Run from the repository root:
+    python misc/bench_cart_core.py [--lines N] [--ops N]
+
+The workload adds --lines rows one at a time (a fifth of them repeat an
+earlier name and price) and reads the total every TOTAL_EVERY adds, then
+updates and removes --ops lines by name. Implementations without an update
+or remove operation report n/a. Every implementation must agree on the
+total after the adds.
+
+code/list_practice.py runs its demo at import time, so its CartItem and
+calculate_total are reproduced here instead of imported, the way
+bench_practice.py reproduces the original CartItem layout.
+"""
+
+import argparse
+import logging
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from cart_core import CartCore, CoreCart, CoreShoppingCart, calculate_total
+from practice import CartEventLog, ShoppingCart, to_cents
+from shopping_cart import Cart
+
+TOTAL_EVERY = 250
+
+
+@dataclass
+class _ListCartItem:
+    """list_practice.CartItem."""
+    item: str
+    price: float
+    quantity: int
+
+    def get_subtotal(self) -> float:
+        return self.price * self.quantity
+
+
+@dataclass
+class _Driver:
+    """Adapts one implementation to the workload; None for unsupported operations."""
+    add: Callable[[str, int, float], None]
+    total: Callable[[], float]
+    update: Optional[Callable[[str, int], object]] = None
+    remove: Optional[Callable[[str], object]] = None
+
+
+def _list_practice() -> _Driver:
+    items: list[_ListCartItem] = []
+
+    def update(name: str, quantity: int) -> None:
+        for item in items:
+            if item.item == name:
+                item.quantity = quantity
+                return
+
+    def remove(name: str) -> None:
+        for position, item in enumerate(items):
+            if item.item == name:
+                del items[position]
+                return
+
+    return _Driver(
+        add=lambda name, quantity, price: items.append(_ListCartItem(name, price, quantity)),
+        # The original calculate_total, minus the print
+        total=lambda: sum(item.get_subtotal() for item in items),
+        update=update,
+        remove=remove,
+    )
+
+
+def _list_practice_cents() -> _Driver:
+    items: list[_ListCartItem] = []
+    return _Driver(
+        add=lambda name, quantity, price: items.append(_ListCartItem(name, price, quantity)),
+        total=lambda: calculate_total(items),
+    )
+
+
+def _cart(cart: object) -> _Driver:
+    return _Driver(add=lambda name, quantity, price: cart.add_item(name, price, quantity),
+                   total=cart.get_total)
+
+
+def _shopping_cart(cart: object) -> _Driver:
+    return _Driver(add=cart.add_to_cart, total=cart.get_total_payment,
+                   update=cart.update_quantity, remove=cart.remove_from_cart)
+
+
+def _core() -> _Driver:
+    core = CartCore(merge=True)
+    return _Driver(add=lambda name, quantity, price: core.add(name, quantity, to_cents(price)),
+                   total=lambda: core.total_cents / 100,
+                   update=core.set_quantity, remove=core.remove)
+
+
+IMPLEMENTATIONS: dict[str, Callable[[], _Driver]] = {
+    "list_practice": _list_practice,
+    "calculate_total (cents)": _list_practice_cents,
+    "shopping_cart.Cart": lambda: _cart(Cart()),
+    "CoreCart": lambda: _cart(CoreCart()),
+    "practice.ShoppingCart": lambda: _shopping_cart(ShoppingCart(events=CartEventLog(capacity=1))),
+    "CoreShoppingCart": lambda: _shopping_cart(CoreShoppingCart(events=CartEventLog(capacity=1))),
+    "CartCore": _core,
+}
+
+
+def _workload(lines: int, ops: int, seed: int = 3) -> tuple[list[tuple[str, int, float]], list[str]]:
+    """Build the rows to add and the names to update and remove."""
+    rng = random.Random(seed)
+    rows: list[tuple[str, int, float]] = []
+    for i in range(lines):
+        if rows and rng.random() < 0.2:
+            name, _, price = rng.choice(rows)
+        else:
+            name, price = f"Product-{i}", rng.randint(1, 99_999) / 100
+        rows.append((name, rng.randint(1, 5), price))
+    names = rng.sample(sorted({name for name, _, _ in rows}), ops)
+    return rows, names
+
+
+def _add_all(driver: _Driver, rows: list[tuple[str, int, float]]) -> None:
+    """Add every row, reading the total every TOTAL_EVERY adds."""
+    add, total = driver.add, driver.total
+    for i, (name, quantity, price) in enumerate(rows, 1):
+        add(name, quantity, price)
+        if i % TOTAL_EVERY == 0:
+            total()
+
+
+def _run(build: Callable[[], _Driver], rows: list[tuple[str, int, float]],
+         names: list[str]) -> tuple[dict[str, Optional[float]], float, int]:
+    """Time each phase; also return the total after the adds and the memory held."""
+    timings: dict[str, Optional[float]] = {}
+
+    # Memory is measured in a separate pass: tracemalloc slows every
+    # allocation down, and not equally for every implementation.
+    tracemalloc.start()
+    driver = build()
+    _add_all(driver, rows)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del driver
+
+    start = time.perf_counter()
+    driver = build()
+    _add_all(driver, rows)
+    timings["add + totals"] = time.perf_counter() - start
+    added_total = driver.total()
+
+    for phase, operation, argument in (("update", driver.update, (7,)), ("remove", driver.remove, ())):
+        if operation is None:
+            timings[phase] = None
+            continue
+        start = time.perf_counter()
+        for name in names:
+            operation(name, *argument)
+        timings[phase] = time.perf_counter() - start
+    return timings, added_total, memory
+
+
+def main() -> None:
+    """Run the workload through every implementation and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=50_000, help="rows to add")
+    parser.add_argument("--ops", type=int, default=1_000, help="updates and removals")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rows, names = _workload(args.lines, args.ops)
+    print(f"{args.lines:,} adds (total read every {TOTAL_EVERY}), "
+          f"{args.ops:,} updates, {args.ops:,} removals")
+    print(f"{'implementation':<24} {'add+totals':>11} {'update':>9} {'remove':>9} {'memory':>10}")
+
+    expected = None
+    for label, build in IMPLEMENTATIONS.items():
+        timings, added_total, memory = _run(build, rows, names)
+        if expected is None:
+            expected = added_total
+        assert round(added_total, 2) == round(expected, 2), (label, added_total, expected)
+        cells = [f"{timings[phase]:>8.3f}s" if timings[phase] is not None else f"{'n/a':>9}"
+                 for phase in ("add + totals", "update", "remove")]
+        print(f"{label:<24} {cells[0]:>11} {cells[1]} {cells[2]} {memory / 2**20:>6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmarks for the ShoppingCart in practice.py.
+
+Run from the repository root:
+    python misc/bench_practice.py [--memory-lines N]
+"""
+
+import argparse
+import logging
+import time
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from practice import CartEventLog, CartItem, ShoppingCart
+
+CART_SIZES = (10, 1_000, 100_000)
+
+
+@dataclass
+class _DictCartItem:
+    """The original CartItem layout: a plain dataclass with a per-instance __dict__."""
+    item_name: str
+    item_quantity: int
+    item_price: float
+
+
+def _scan_find(items: list[CartItem], item_name: str) -> Optional[CartItem]:
+    """The original linear lookup, kept as the baseline."""
+    for item in items:
+        if item.item_name.lower() == item_name.lower():
+            return item
+    return None
+
+
+def _build_cart(size: int) -> ShoppingCart:
+    """Build a cart with `size` distinct lines."""
+    return ShoppingCart(CartItem(f"Product-{i}", 1, 9.99) for i in range(size))
+
+
+def bench_lookup(sizes: tuple[int, ...] = CART_SIZES, repeat: int = 5) -> None:
+    """Compare the linear scan against the name index for a worst-case lookup."""
+    print(f"{'lines':>10} {'scan (us)':>14} {'index (us)':>14} {'speedup':>10}")
+    for size in sizes:
+        cart = _build_cart(size)
+        items = cart.items
+        target = f"PRODUCT-{size - 1}"
+        number = max(1, 100_000 // size)
+
+        scan = min(timeit.repeat(lambda: _scan_find(items, target), number=number, repeat=repeat))
+        index = min(timeit.repeat(lambda: cart.find_item(target), number=number, repeat=repeat))
+
+        scan_us = scan / number * 1e6
+        index_us = index / number * 1e6
+        print(f"{size:>10} {scan_us:>14.3f} {index_us:>14.3f} {scan_us / index_us:>9.1f}x")
+
+
+def bench_bulk_insert(size: int = 100_000) -> None:
+    """Compare add_to_cart in a loop against a single add_many call."""
+    rows = [(f"Product-{i}", 1 + i % 5, 9.99 + i % 100) for i in range(size)]
+
+    start = time.perf_counter()
+    cart = ShoppingCart()
+    for row in rows:
+        cart.add_to_cart(*row)
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ShoppingCart().add_many(rows)
+    bulk = time.perf_counter() - start
+
+    print(f"{'add_to_cart loop':<18} {size / loop:>12,.0f} lines/s")
+    print(f"{'add_many':<18} {size / bulk:>12,.0f} lines/s")
+
+
+def _traced_bytes(build: Callable[[], object]) -> int:
+    """Return the memory still allocated by build() once it returns."""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = build()
+        used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del result
+    return used
+
+
+def bench_memory(size: int) -> None:
+    """Compare per-line memory of the old dataclass against the slotted CartItem."""
+    names = [f"Product-{i}" for i in range(size)]
+
+    def old_items() -> list:
+        return [_DictCartItem(name, 1, 9.99) for name in names]
+
+    def new_items() -> list:
+        return [CartItem._from_validated(name, 1, 9.99, 999) for name in names]
+
+    def new_cart() -> ShoppingCart:
+        cart = ShoppingCart(events=CartEventLog(capacity=1))
+        cart.add_columns(names, [1] * size, [9.99] * size)
+        return cart
+
+    for label, build in (("dataclass items (old)", old_items),
+                         ("slotted CartItem", new_items),
+                         ("ShoppingCart + index", new_cart)):
+        used = _traced_bytes(build)
+        print(f"{label:<22} {used / 2**20:>10.1f} MiB {used / size:>8.1f} B/line")
+
+
+def main() -> None:
+    """Run all benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--memory-lines", type=int, default=10_000_000,
+                        help="number of lines for the memory benchmark")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    print("Lookup of the last line (find_item / update_quantity / remove_from_cart)")
+    bench_lookup()
+    print("\nBulk insert of 100k lines")
+    bench_bulk_insert()
+    print(f"\nMemory for {args.memory_lines:,} lines (input names excluded)")
+    bench_memory(args.memory_lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,567 @@
+"""
+One cart core behind the repo's three cart APIs.
+
+code/list_practice.py, shopping_cart.py and practice.py each define their own
+CartItem, with different field orders (item_price before item_quantity in the
+first two, after it in practice.py) and different semantics: no
+deduplication, merging on the exact (name, price), and case-insensitive
+lookups. CartCore implements the shared part once:
+
+- lines are stored column-wise (names, quantities and prices in integer
+  cents), with no object per line;
+- a name index gives O(1) find, update and remove, case-insensitively or not;
+- optional merging folds lines with the same name and price into one;
+- the total and item count are maintained as lines change.
+
+The adapters below put the existing APIs on top of it:
+
+    CoreCart             shopping_cart.Cart
+    CoreShoppingCart     practice.ShoppingCart
+
+list_practice has no cart object to adapt, only a list of items, so
+calculate_total gives it an exact total with a plain integer sum instead.
+
+Money is handled in integer cents throughout, so totals are exact where the
+float implementations drift (0.1 + 0.2 style), and prices are rounded to
+cents on the way in. bench_cart_core.py runs one workload through every
+implementation.
+"""
+
+from array import array
+from typing import Iterable, Iterator, Mapping, Optional, TextIO, Union
+import logging
+import sys
+
+from practice import (
+    CENTS_PER_UNIT,
+    MIN_QUANTITY,
+    BulkValidationError,
+    CartEventLog,
+    CartItem,
+    CartTransaction,
+    InvalidPriceError,
+    InvalidQuantityError,
+    ShoppingCart,
+    cart_events,
+    check_item,
+    discount_cents,
+    from_cents,
+    render_chunks,
+    resolve_changes,
+    to_cents,
+    validate_item,
+)
+import shopping_cart
+
+logger = logging.getLogger(__name__)
+
+# Removed lines are compacted away once they are at least this many and
+# outnumber the live ones.
+COMPACT_MIN_DEAD_LINES = 64
+
+class CartCore:
+    """
+    Column-oriented cart line storage.
+
+    Lines are (name, quantity, price in cents). Removing a line leaves a hole
+    that is reclaimed by compaction once holes outnumber live lines, so
+    removal is amortized O(1) and insertion order is preserved.
+
+    Attributes:
+        merge: Whether adding a line with the name and price of an existing
+            line adds to its quantity instead
+        casefold: Whether names are matched case-insensitively
+        total_cents: Sum of quantity * price over all lines
+        item_count: Sum of the quantities
+    """
+
+    __slots__ = ("merge", "casefold", "total_cents", "item_count",
+                 "_names", "_quantities", "_prices", "_index", "_merge_index", "_dead")
+
+    def __init__(self, merge: bool = False, casefold: bool = True) -> None:
+        self.merge = merge
+        self.casefold = casefold
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove every line."""
+        self.total_cents = 0
+        self.item_count = 0
+        # Parallel columns; a removed line has name None and quantity 0.
+        self._names: list[Optional[str]] = []
+        self._quantities = array("q")
+        self._prices = array("q")
+        # A key maps to its line position, or to a list of them only when the name repeats.
+        self._index: dict[str, Union[int, list[int]]] = {}
+        # Only maintained with merge: (key, price cents) -> line position.
+        self._merge_index: dict[tuple[str, int], int] = {}
+        self._dead = 0
+
+    def _key(self, name: str) -> str:
+        return name.casefold() if self.casefold else name
+
+    def _first(self, key: str) -> Optional[int]:
+        entry = self._index.get(key)
+        if isinstance(entry, list):
+            return entry[0]
+        return entry
+
+    def add(self, name: str, quantity: int, price_cents: int) -> None:
+        """Append a line, or add to the matching line when merging."""
+        key = self._key(name)
+        if self.merge:
+            merge_key = (key, price_cents)
+            position = self._merge_index.get(merge_key)
+            if position is not None:
+                self._quantities[position] += quantity
+                self.total_cents += quantity * price_cents
+                self.item_count += quantity
+                return
+            self._merge_index[merge_key] = len(self._names)
+
+        position = len(self._names)
+        self._names.append(name)
+        self._quantities.append(quantity)
+        self._prices.append(price_cents)
+        entry = self._index.get(key)
+        if entry is None:
+            self._index[key] = position
+        elif isinstance(entry, list):
+            entry.append(position)
+        else:
+            self._index[key] = [entry, position]
+        self.total_cents += quantity * price_cents
+        self.item_count += quantity
+
+    def add_many(self, rows: Iterable[tuple[str, int, int]]) -> int:
+        """
+        Append many (name, quantity, price_cents) lines.
+
+        Returns:
+            Number of rows added (rows merged into existing lines included)
+        """
+        if self.merge:
+            count = 0
+            for name, quantity, price_cents in rows:
+                self.add(name, quantity, price_cents)
+                count += 1
+            return count
+
+        # Same bookkeeping as add, inlined with local lookups for the hot loop.
+        names = self._names
+        quantities = self._quantities
+        prices = self._prices
+        index = self._index
+        casefold = self.casefold
+        position = len(names)
+        start = position
+        total_cents = item_count = 0
+        for name, quantity, price_cents in rows:
+            names.append(name)
+            quantities.append(quantity)
+            prices.append(price_cents)
+            key = name.casefold() if casefold else name
+            entry = index.get(key)
+            if entry is None:
+                index[key] = position
+            elif isinstance(entry, list):
+                entry.append(position)
+            else:
+                index[key] = [entry, position]
+            total_cents += quantity * price_cents
+            item_count += quantity
+            position += 1
+        self.total_cents += total_cents
+        self.item_count += item_count
+        return position - start
+
+    def find(self, name: str) -> Optional[tuple[str, int, int]]:
+        """Return the first (name, quantity, price_cents) line with this name, or None."""
+        position = self._first(self._key(name))
+        if position is None:
+            return None
+        return self._names[position], self._quantities[position], self._prices[position]
+
+    def set_quantity(self, name: str, quantity: int) -> Optional[int]:
+        """
+        Set the quantity of the first line with this name.
+
+        Returns:
+            The previous quantity, or None if there is no such line
+        """
+        position = self._first(self._key(name))
+        if position is None:
+            return None
+        old_quantity = self._quantities[position]
+        self._quantities[position] = quantity
+        self.total_cents += (quantity - old_quantity) * self._prices[position]
+        self.item_count += quantity - old_quantity
+        return old_quantity
+
+    def remove(self, name: str) -> bool:
+        """Remove the first line with this name; False if there is none."""
+        key = self._key(name)
+        entry = self._index.get(key)
+        if entry is None:
+            return False
+        if isinstance(entry, list):
+            position = entry.pop(0)
+            if len(entry) == 1:
+                self._index[key] = entry[0]
+        else:
+            position = entry
+            del self._index[key]
+
+        price_cents = self._prices[position]
+        quantity = self._quantities[position]
+        merge_key = (key, price_cents)
+        if self._merge_index.get(merge_key) == position:
+            del self._merge_index[merge_key]
+        self._names[position] = None
+        self._quantities[position] = 0
+        self.total_cents -= quantity * price_cents
+        self.item_count -= quantity
+        self._dead += 1
+        if self._dead >= COMPACT_MIN_DEAD_LINES and self._dead * 2 > len(self._names):
+            self._compact()
+        return True
+
+    def _compact(self) -> None:
+        """Drop removed lines and rebuild the indexes for the new positions."""
+        self._rebuild(list(self.lines()))
+
+    def merge_lines(self) -> int:
+        """
+        Fold lines that share a key and a price into the first of them.
+
+        Returns:
+            Number of lines merged away
+        """
+        key = self._key
+        firsts: dict[tuple[str, int], list] = {}
+        rows = []
+        for name, quantity, price_cents in self.lines():
+            row = firsts.get((key(name), price_cents))
+            if row is None:
+                row = firsts[(key(name), price_cents)] = [name, quantity, price_cents]
+                rows.append(row)
+            else:
+                row[1] += quantity
+        merged = len(self) - len(rows)
+        if merged:
+            self._rebuild([tuple(row) for row in rows])
+        return merged
+
+    def _rebuild(self, rows: list[tuple[str, int, int]]) -> None:
+        """Replace every line with rows whose merge keys are distinct."""
+        merge = self.merge
+        self.clear()
+        # Live lines already have distinct merge keys, so nothing merges here.
+        self.merge = False
+        self.add_many(rows)
+        self.merge = merge
+        if merge:
+            key = self._key
+            self._merge_index = {
+                (key(name), price_cents): position
+                for position, (name, _, price_cents) in enumerate(rows)
+            }
+
+    def lines(self) -> Iterator[tuple[str, int, int]]:
+        """Yield (name, quantity, price_cents) for every line in insertion order."""
+        for name, quantity, price_cents in zip(self._names, self._quantities, self._prices):
+            if name is not None:
+                yield name, quantity, price_cents
+
+    def __len__(self) -> int:
+        """Return the number of lines."""
+        return len(self._names) - self._dead
+
+
+def calculate_total(cart: Iterable) -> float:
+    """
+    list_practice.calculate_total, returning the total instead of printing it.
+
+    The point is exactness, not speed: rounding every price to cents costs
+    more than the float sum, which drifts on large carts.
+
+    Args:
+        cart: Items with `price` and `quantity` attributes, such as
+            list_practice.CartItem
+
+    Returns:
+        The total, summed in exact cents; prices are expected to be whole
+        cents, as practice.check_item requires
+    """
+    return from_cents(sum(item.quantity * round(item.price * CENTS_PER_UNIT) for item in cart))
+
+
+class CoreCart:
+    """
+    shopping_cart.Cart on top of CartCore.
+
+    Lines with the same exact name and the same price in cents are merged as
+    they are added, so clear_duplicated_items() has nothing left to do.
+    Totals are maintained incrementally rather than cached. `items` returns a
+    tuple of fresh shopping_cart.CartItem objects; edit the cart through
+    add_item.
+    """
+
+    def __init__(self, items: Optional[Iterable[shopping_cart.CartItem]] = None) -> None:
+        self._core = CartCore(merge=True, casefold=False)
+        self.version = 0
+        for item in items or ():
+            self.add_item(item.item_name, item.item_price, item.item_quantity)
+
+    @property
+    def items(self) -> tuple[shopping_cart.CartItem, ...]:
+        return tuple(shopping_cart.CartItem(name, from_cents(price_cents), quantity)
+                     for name, quantity, price_cents in self._core.lines())
+
+    def add_item(self, item_name: str, item_price: float, item_quantity: int) -> None:
+        self._core.add(item_name, item_quantity, to_cents(item_price))
+        self.version += 1
+
+    def clear_duplicated_items(self) -> None:
+        # Lines are merged on insert
+        pass
+
+    def is_current(self, version: int) -> bool:
+        return version == self.version
+
+    def get_subtotals(self) -> list[float]:
+        return [from_cents(quantity * price_cents) for _, quantity, price_cents in self._core.lines()]
+
+    def get_total(self) -> float:
+        return from_cents(self._core.total_cents)
+
+    def print_cart(self) -> None:
+        print("Shopping Cart Contents:")
+        print("-" * 50)
+        for name, quantity, price_cents in self._core.lines():
+            print(f"Item: {name}")
+            print(f"Price: ${from_cents(price_cents):.2f}")
+            print(f"Quantity: {quantity}")
+            print(f"Subtotal: ${from_cents(quantity * price_cents):.2f}")
+            print("-" * 50)
+        print(f"Total: ${self.get_total():.2f}")
+
+
+class CoreShoppingCart:
+    """
+    practice.ShoppingCart on top of CartCore.
+
+    Validation, exceptions, events and rendering match ShoppingCart. Lines
+    are not CartItem objects here: `items` and find_item() return snapshots,
+    so quantities change only through the cart. Prices are kept in cents, and
+    displayed prices are derived from them.
+
+    Attributes:
+        events: Event log that records cart mutations
+        merge_duplicates: Whether matching lines are merged on insert
+    """
+
+    def __init__(self, items: Optional[Iterable[CartItem]] = None,
+                 events: Optional[CartEventLog] = None,
+                 merge_duplicates: bool = False) -> None:
+        self.events = events if events is not None else cart_events
+        self.merge_duplicates = merge_duplicates
+        self._core = CartCore(merge=merge_duplicates)
+        self._core.add_many((item.item_name, item.item_quantity, item.price_cents)
+                            for item in items or ())
+
+    @property
+    def items(self) -> tuple[CartItem, ...]:
+        """Snapshot of the cart lines in insertion order; read-only, edit through the cart."""
+        from_validated = CartItem._from_validated
+        return tuple(from_validated(name, quantity, from_cents(price_cents), price_cents)
+                     for name, quantity, price_cents in self._core.lines())
+
+    def add_to_cart(self, item_name: str, item_quantity: int, item_price: float) -> None:
+        """Add a new item to the cart (see ShoppingCart.add_to_cart)."""
+        try:
+            validate_item(item_name, item_quantity, item_price)
+        except (InvalidQuantityError, InvalidPriceError, ValueError) as e:
+            logger.error("Failed to add item '%s': %s", item_name, e)
+            raise
+        price_cents = to_cents(item_price)
+        self._core.add(item_name, item_quantity, price_cents)
+        self.events.emit("add", name=item_name, quantity=item_quantity, price_cents=price_cents)
+
+    def add_many(self, rows: Iterable[tuple[str, int, float]]) -> int:
+        """
+        Add many items at once, all or nothing (see ShoppingCart.add_many).
+
+        Raises:
+            BulkValidationError: If any row is invalid; lists every bad row
+        """
+        validated = []
+        errors = []
+        cents_by_price: dict[float, int] = {}
+        for row, (item_name, item_quantity, item_price) in enumerate(rows):
+            error = check_item(item_name, item_quantity, item_price)
+            if error is not None:
+                errors.append((row, str(error)))
+            elif not errors:
+                price_cents = cents_by_price.get(item_price)
+                if price_cents is None:
+                    price_cents = cents_by_price[item_price] = to_cents(item_price)
+                validated.append((item_name, item_quantity, price_cents))
+
+        if errors:
+            logger.error("Rejected bulk insert: %d invalid row(s)", len(errors))
+            raise BulkValidationError(errors)
+
+        core = self._core
+        total_before, count_before = core.total_cents, core.item_count
+        added = core.add_many(validated)
+        self.events.emit("add_many", lines=added, quantity=core.item_count - count_before,
+                         total_cents=core.total_cents - total_before)
+        return added
+
+    def add_columns(self, item_names: Iterable[str], item_quantities: Iterable[int],
+                    item_prices: Iterable[float]) -> int:
+        """
+        Add many items from parallel columns, all or nothing (see ShoppingCart.add_columns).
+
+        Raises:
+            BulkValidationError: If any row is invalid
+            ValueError: If the columns have different lengths
+        """
+        return self.add_many(zip(item_names, item_quantities, item_prices, strict=True))
+
+    def remove_from_cart(self, item_name: str) -> bool:
+        """Remove the first line with this name; False if there is none."""
+        if self._core.remove(item_name):
+            self.events.emit("remove", name=item_name)
+            return True
+        logger.warning("Item not found for removal: %s", item_name)
+        return False
+
+    def update_quantity(self, item_name: str, new_quantity: int) -> bool:
+        """
+        Update the quantity of the first line with this name.
+
+        Raises:
+            InvalidQuantityError: If new quantity is invalid
+        """
+        if new_quantity < MIN_QUANTITY:
+            raise InvalidQuantityError(
+                f"Quantity must be at least {MIN_QUANTITY}, got {new_quantity}"
+            )
+        old_quantity = self._core.set_quantity(item_name, new_quantity)
+        if old_quantity is not None:
+            self.events.emit("update", name=item_name, old_quantity=old_quantity,
+                             new_quantity=new_quantity)
+            return True
+        logger.warning("Item not found for quantity update: %s", item_name)
+        return False
+
+    def apply_changes(self, updates: Optional[Mapping[str, int]] = None,
+                      removals: Iterable[str] = ()) -> int:
+        """
+        Apply many quantity updates and removals, all or nothing (see ShoppingCart.apply_changes).
+
+        Raises:
+            ChangeSetError: If any change is invalid; lists every problem
+        """
+        core = self._core
+        updates = updates or {}
+        removals = list(removals)
+        resolved_updates, resolved_removals = resolve_changes(core.find, core._key, updates, removals)
+        # Every name was checked to exist, and no line is both updated and removed.
+        for item_name, new_quantity in updates.items():
+            core.set_quantity(item_name, new_quantity)
+        for item_name in removals:
+            core.remove(item_name)
+        self.events.emit("apply_changes", updated=len(resolved_updates),
+                         removed=len(resolved_removals))
+        return len(resolved_updates) + len(resolved_removals)
+
+    def compact(self) -> int:
+        """Merge lines that share a name and a price (see ShoppingCart.compact)."""
+        merged = self._core.merge_lines()
+        if merged:
+            self.events.emit("compact", merged=merged)
+        return merged
+
+    def transaction(self) -> CartTransaction:
+        """Collect changes and apply them together when the block exits."""
+        return CartTransaction(self)
+
+    def get_item_count(self) -> int:
+        """Return the sum of all item quantities."""
+        return self._core.item_count
+
+    def get_total_payment(self) -> float:
+        """Return the total price of all items."""
+        return from_cents(self._core.total_cents)
+
+    def get_total_cents(self) -> int:
+        """Return the total price of all items in cents."""
+        return self._core.total_cents
+
+    def apply_discount(self, discount_percent: float) -> float:
+        """
+        Calculate total after applying a percentage discount.
+
+        Raises:
+            InvalidDiscountError: If discount is invalid
+        """
+        total_cents = self._core.total_cents
+        total = from_cents(total_cents)
+        discounted_total = from_cents(discount_cents(total_cents, discount_percent))
+        self.events.emit("discount", percent=discount_percent, total=total,
+                         discounted_total=discounted_total)
+        return discounted_total
+
+    def find_item(self, item_name: str) -> Optional[CartItem]:
+        """Return a snapshot of the first line with this name, or None."""
+        line = self._core.find(item_name)
+        if line is None:
+            return None
+        name, quantity, price_cents = line
+        return CartItem._from_validated(name, quantity, from_cents(price_cents), price_cents)
+
+    def is_empty(self) -> bool:
+        """Check if the cart is empty."""
+        return len(self._core) == 0
+
+    def clear_cart(self) -> None:
+        """Remove all items from the cart."""
+        line_count = len(self._core)
+        self._core.clear()
+        self.events.emit("clear", lines=line_count)
+
+    def _render_chunks(self, page: int = 1, page_size: Optional[int] = None) -> Iterator[str]:
+        core = self._core
+        lines = ((name, quantity, from_cents(price_cents), price_cents)
+                 for name, quantity, price_cents in core.lines())
+        return render_chunks(lines, len(core), core.item_count, core.total_cents, page, page_size)
+
+    def render(self, page: int = 1, page_size: Optional[int] = None) -> str:
+        """Render the cart summary into a single string."""
+        return "".join(self._render_chunks(page, page_size))
+
+    def print_shopping_cart(self, out: Optional[TextIO] = None, page: int = 1,
+                            page_size: Optional[int] = None) -> None:
+        """Print a formatted summary of the shopping cart."""
+        write = (out if out is not None else sys.stdout).write
+        for chunk in self._render_chunks(page, page_size):
+            write(chunk)
+
+    def __len__(self) -> int:
+        """Return the number of lines in the cart."""
+        return len(self._core)
+
+    def __eq__(self, other: object) -> bool:
+        """Carts are equal when they hold equal lines in the same order."""
+        if not isinstance(other, (CoreShoppingCart, ShoppingCart)):
+            return NotImplemented
+        return self.items == other.items
+
+    def __repr__(self) -> str:
+        return f"CoreShoppingCart(items={self.items!r})"
+
+    def __str__(self) -> str:
+        return f"CoreShoppingCart(items={len(self)}, total=${self.get_total_payment():.2f})"
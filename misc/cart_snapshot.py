@@ -0,0 +1,346 @@
+"""
+Binary snapshots of ShoppingCart state.
+
+A snapshot file holds any number of carts, each stored under a key (for
+example a session id). Carts are written one at a time, so a whole fleet of
+carts can be streamed to disk, and they are read back through a memory-mapped
+file: carts are only decoded into CartItem objects when asked for.
+
+File layout (little endian):
+    header:  magic b"CSNP", version u16, reserved u16
+    cart:    key length u16, key bytes (UTF-8), line count u32,
+             payload length u64, flags u8, payload
+    payload: per line: name length u16, name bytes (UTF-8),
+             quantity u32, price f64, price in cents i64
+
+Flags record cart settings (FLAG_MERGE_DUPLICATES). Version 1 files, whose
+cart records have no flags byte, are still read.
+"""
+
+import mmap
+import os
+import struct
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+from practice import CartEventLog, ShoppingCart, ShoppingCartError
+
+MAGIC = b"CSNP"
+VERSION = 2
+FLAG_MERGE_DUPLICATES = 0x01
+
+_HEADER = struct.Struct("<4sHH")
+_KEY_LENGTH = struct.Struct("<H")
+_CART_HEADERS = {1: struct.Struct("<IQ"), 2: struct.Struct("<IQB")}
+_CART_HEADER = _CART_HEADERS[VERSION]
+_NAME_LENGTH = struct.Struct("<H")
+_LINE = struct.Struct("<Idq")
+
+MAX_ENCODED_LENGTH = 2**16 - 1
+MAX_QUANTITY = 2**32 - 1
+
+
+class SnapshotFormatError(ShoppingCartError):
+    """Raised when a snapshot file is corrupt or has an unsupported version."""
+    pass
+
+
+class SnapshotLimitError(ShoppingCartError):
+    """Raised when a cart has a key, name or quantity too large for the snapshot format."""
+    pass
+
+
+def write_header(fp: BinaryIO) -> None:
+    """
+    Write the snapshot file header.
+
+    Args:
+        fp: Binary file opened for writing
+    """
+    fp.write(_HEADER.pack(MAGIC, VERSION, 0))
+
+
+def write_cart(fp: BinaryIO, key: str, cart: ShoppingCart) -> None:
+    """
+    Append one cart record to a snapshot stream.
+
+    Args:
+        fp: Binary file positioned after the header
+        key: Identifier stored with the cart, e.g. a session id
+        cart: Cart to serialize
+
+    Raises:
+        SnapshotLimitError: If the key or an item name is longer than
+            MAX_ENCODED_LENGTH bytes in UTF-8, or a quantity exceeds MAX_QUANTITY
+    """
+    encoded_key = key.encode("utf-8")
+    if len(encoded_key) > MAX_ENCODED_LENGTH:
+        raise SnapshotLimitError(
+            f"Cart key is {len(encoded_key)} bytes; at most {MAX_ENCODED_LENGTH} fit a snapshot")
+    payload = bytearray()
+    line_count = 0
+    for item in cart.items:
+        name = item.item_name.encode("utf-8")
+        if len(name) > MAX_ENCODED_LENGTH:
+            raise SnapshotLimitError(
+                f"Item name in cart '{key}' is {len(name)} bytes; "
+                f"at most {MAX_ENCODED_LENGTH} fit a snapshot")
+        if item.item_quantity > MAX_QUANTITY:
+            raise SnapshotLimitError(
+                f"Quantity {item.item_quantity} of '{item.item_name}' in cart '{key}' "
+                f"exceeds the snapshot limit of {MAX_QUANTITY}")
+        payload += _NAME_LENGTH.pack(len(name))
+        payload += name
+        payload += _LINE.pack(item.item_quantity, item.item_price, item.price_cents)
+        line_count += 1
+
+    fp.write(_KEY_LENGTH.pack(len(encoded_key)))
+    fp.write(encoded_key)
+    flags = FLAG_MERGE_DUPLICATES if cart.merge_duplicates else 0
+    fp.write(_CART_HEADER.pack(line_count, len(payload), flags))
+    fp.write(payload)
+
+
+def save_snapshot(path: str, carts: Iterable[tuple[str, ShoppingCart]]) -> int:
+    """
+    Stream many carts into a snapshot file.
+
+    The file is written next to its destination and renamed into place, so a
+    crash never leaves a half-written snapshot behind; if writing fails, the
+    temporary file is removed and the destination is left untouched.
+
+    Args:
+        path: Destination file
+        carts: (key, cart) pairs
+
+    Returns:
+        Number of carts written
+
+    Raises:
+        SnapshotLimitError: If a cart does not fit the format (see write_cart)
+    """
+    temp_path = f"{path}.tmp"
+    count = 0
+    replaced = False
+    try:
+        with open(temp_path, "wb") as fp:
+            write_header(fp)
+            for key, cart in carts:
+                write_cart(fp, key, cart)
+                count += 1
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(temp_path, path)
+        replaced = True
+    finally:
+        if not replaced:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+    return count
+
+
+class SnapshotCart:
+    """
+    A cart record inside a memory-mapped snapshot, decoded on demand.
+
+    Attributes:
+        key: Identifier the cart was stored under
+        line_count: Number of lines in the cart
+        merge_duplicates: The cart's merge_duplicates setting
+    """
+
+    __slots__ = ("key", "line_count", "merge_duplicates", "_buffer", "_offset", "_end")
+
+    def __init__(self, key: str, line_count: int, buffer: mmap.mmap,
+                 offset: int, end: int, merge_duplicates: bool = False) -> None:
+        self.key = key
+        self.line_count = line_count
+        self.merge_duplicates = merge_duplicates
+        self._buffer = buffer
+        self._offset = offset
+        self._end = end
+
+    def lines(self) -> Iterator[tuple[str, int, float, int]]:
+        """
+        Decode the cart lines without building CartItem objects.
+
+        Yields:
+            (item_name, item_quantity, item_price, price_cents) tuples
+        """
+        buffer = self._buffer
+        offset = self._offset
+        for _ in range(self.line_count):
+            (name_length,) = _NAME_LENGTH.unpack_from(buffer, offset)
+            offset += _NAME_LENGTH.size
+            name = str(buffer[offset:offset + name_length], "utf-8")
+            offset += name_length
+            quantity, price, price_cents = _LINE.unpack_from(buffer, offset)
+            offset += _LINE.size
+            yield name, quantity, price, price_cents
+        if offset != self._end:
+            raise SnapshotFormatError(f"Cart '{self.key}' payload length mismatch")
+
+    def to_cart(self, events: Optional[CartEventLog] = None,
+                cart_type: type[ShoppingCart] = ShoppingCart,
+                cart_factory: Optional[Callable[[], ShoppingCart]] = None) -> ShoppingCart:
+        """
+        Materialize the record as a ShoppingCart.
+
+        Args:
+            events: Event log for the restored cart (defaults to the module log)
+            cart_type: ShoppingCart class (or subclass) to build
+            cart_factory: Makes the empty cart to restore into, keeping its
+                class and event log; overrides events and cart_type
+
+        Returns:
+            The restored cart, with the stored merge_duplicates setting
+        """
+        if cart_factory is None:
+            cart = cart_type(events=events, merge_duplicates=self.merge_duplicates)
+        else:
+            cart = cart_factory()
+            cart.merge_duplicates = self.merge_duplicates
+        # One CartItem per line, inserted directly rather than copied by the constructor
+        cart._load_validated(self.lines())
+        return cart
+
+    def __repr__(self) -> str:
+        """Debug representation without decoding the lines."""
+        return f"SnapshotCart(key={self.key!r}, line_count={self.line_count})"
+
+
+class SnapshotReader:
+    """
+    Memory-mapped reader for snapshot files.
+
+    Use as a context manager; SnapshotCart records it yields are only valid
+    until the reader is closed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        try:
+            if os.fstat(self._file.fileno()).st_size < _HEADER.size:
+                raise SnapshotFormatError(f"{path} is too short to be a snapshot")
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+
+        magic, version, _ = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            self.close()
+            raise SnapshotFormatError(f"{path} is not a cart snapshot")
+        if version not in _CART_HEADERS:
+            self.close()
+            raise SnapshotFormatError(f"Unsupported snapshot version {version} in {path}")
+        self._cart_header = _CART_HEADERS[version]
+
+    def __iter__(self) -> Iterator[SnapshotCart]:
+        """
+        Walk the cart records, skipping over payloads without decoding them.
+
+        Yields:
+            One SnapshotCart per stored cart
+        """
+        buffer = self._buffer
+        cart_header = self._cart_header
+        size = len(buffer)
+        offset = _HEADER.size
+        while offset < size:
+            try:
+                (key_length,) = _KEY_LENGTH.unpack_from(buffer, offset)
+                offset += _KEY_LENGTH.size
+                key = str(buffer[offset:offset + key_length], "utf-8")
+                offset += key_length
+                line_count, payload_length, *flags = cart_header.unpack_from(buffer, offset)
+                offset += cart_header.size
+            except struct.error as e:
+                raise SnapshotFormatError(f"Truncated cart header at byte {offset}") from e
+            end = offset + payload_length
+            if end > size:
+                raise SnapshotFormatError(f"Truncated payload for cart '{key}'")
+            merge_duplicates = bool(flags and flags[0] & FLAG_MERGE_DUPLICATES)
+            yield SnapshotCart(key, line_count, buffer, offset, end, merge_duplicates)
+            offset = end
+
+    def load_all(self, events: Optional[CartEventLog] = None,
+                 cart_type: type[ShoppingCart] = ShoppingCart,
+                 cart_factory: Optional[Callable[[], ShoppingCart]] = None) -> dict[str, ShoppingCart]:
+        """
+        Materialize every cart in the snapshot.
+
+        Args:
+            events: Event log for the restored carts
+            cart_type: ShoppingCart class (or subclass) to build
+            cart_factory: Makes the empty carts to restore into (see SnapshotCart.to_cart)
+
+        Returns:
+            Carts keyed by the key they were stored under
+        """
+        return {record.key: record.to_cart(events, cart_type, cart_factory) for record in self}
+
+    def close(self) -> None:
+        """Unmap the file and close it."""
+        self._buffer.close()
+        self._file.close()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def main() -> None:
+    """
+    Round-trip a batch of carts through a snapshot file and time it.
+    """
+    import tempfile
+    import time
+
+    cart_count = 100_000
+    events = CartEventLog(capacity=1)
+    carts = []
+    for i in range(cart_count):
+        cart = ShoppingCart(events=events)
+        cart.add_many([("Laptop", 1, 999.99), ("Mouse", 1 + i % 3, 29.99), (f"Cable-{i % 50}", 2, 4.5)])
+        carts.append((f"session-{i}", cart))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "carts.snap")
+
+        start = time.perf_counter()
+        save_snapshot(path, carts)
+        written = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with SnapshotReader(path) as reader:
+            records = list(reader)
+            scanned = time.perf_counter() - start
+            restored = {record.key: record.to_cart(events) for record in records}
+        loaded = time.perf_counter() - start
+
+        assert all(restored[key] == cart for key, cart in carts)
+
+        # Carts the format cannot hold fail clearly and leave no temporary file
+        for key, name, quantity in (("k" * 70_000, "Cable", 1), ("big", "Cable", 2**32),
+                                    ("long", "é" * 40_000, 1)):
+            oversized = ShoppingCart(events=events)
+            oversized.add_to_cart(name, quantity, 1.0)
+            try:
+                save_snapshot(path, [("ok", carts[0][1]), (key, oversized)])
+            except SnapshotLimitError:
+                pass
+            else:
+                raise AssertionError("oversized cart was written")
+        assert sorted(os.listdir(directory)) == ["carts.snap"]
+        print(f"{cart_count:,} carts, {os.path.getsize(path) / 2**20:.1f} MiB")
+        print(f"write:       {written:.2f}s")
+        print(f"scan (lazy): {scanned:.2f}s")
+        print(f"materialize: {loaded:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,505 @@
+"""
+Sharded in-memory owner for ShoppingCart sessions.
+
+CartStore keeps carts keyed by session id in a fixed number of shards, each
+with its own lock and LRU ordering, so concurrent requests for different
+sessions rarely contend. Carts are evicted when idle for longer than the TTL
+or when a shard exceeds its share of the memory budget; evicted carts can be
+handed to a persistence hook and restored from it on the next miss.
+
+A cart that is being written out is still found by get(), which takes it
+back instead of reading a half-finished spill. Carts held with checkout()
+are never evicted; a cart obtained from get() or get_or_create() and kept
+past its eviction is detached, and later changes to it are not stored.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Protocol
+
+from cart_snapshot import SnapshotReader, save_snapshot
+from concurrent_cart import ThreadSafeShoppingCart
+from practice import CartEventLog, ShoppingCart
+
+DEFAULT_SHARDS = 16
+DEFAULT_TTL_SECONDS = 30 * 60
+DEFAULT_MEMORY_BUDGET = 512 * 2**20
+# Rough per-cart and per-line costs, measured with bench_practice.py.
+CART_OVERHEAD_BYTES = 1024
+LINE_OVERHEAD_BYTES = 300
+
+
+class CartSpill(Protocol):
+    """Persistence hook for carts evicted from a CartStore."""
+
+    def spill(self, session_id: str, cart: ShoppingCart) -> None:
+        """Persist an evicted cart."""
+        ...
+
+    def restore(self, session_id: str,
+                cart_factory: Callable[[], ShoppingCart]) -> Optional[ShoppingCart]:
+        """Load a previously spilled cart into a cart from cart_factory and forget it, or return None."""
+        ...
+
+    def discard(self, session_id: str) -> None:
+        """Forget a spilled cart without loading it."""
+        ...
+
+
+class DirectorySpill:
+    """
+    Spill evicted carts to one snapshot file per session in a directory.
+
+    Carts are restored into a cart made by the store's cart_factory, so they
+    keep its class and event log; merge_duplicates is stored in the snapshot.
+
+    Attributes:
+        directory: Where snapshot files are written
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        """Map a session id to a file name that is safe on any file system."""
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.snap")
+
+    def spill(self, session_id: str, cart: ShoppingCart) -> None:
+        """Write the cart to its snapshot file."""
+        save_snapshot(self._path(session_id), [(session_id, cart)])
+
+    def restore(self, session_id: str,
+                cart_factory: Callable[[], ShoppingCart]) -> Optional[ShoppingCart]:
+        """Load the cart from its snapshot file and delete the file."""
+        path = self._path(session_id)
+        try:
+            reader = SnapshotReader(path)
+        except FileNotFoundError:
+            return None
+        with reader:
+            carts = reader.load_all(cart_factory=cart_factory)
+        self.discard(session_id)
+        return carts.get(session_id)
+
+    def discard(self, session_id: str) -> None:
+        """Delete the cart's snapshot file, if there is one."""
+        try:
+            os.remove(self._path(session_id))
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class CartStoreStats:
+    """Counters aggregated over all shards."""
+    carts: int = 0
+    estimated_bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    restored: int = 0
+    ttl_evictions: int = 0
+    memory_evictions: int = 0
+
+
+@dataclass
+class _Entry:
+    cart: ShoppingCart
+    last_access: float
+    estimated_bytes: int
+    pins: int = 0
+
+
+class _Shard:
+    """
+    One lock-protected slice of the store, ordered from least to most recently used.
+
+    Evicted entries stay in `spilling` until the spill hook has written them.
+    spill_lock orders spill and restore I/O within the shard and is always
+    taken before lock.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.spill_lock = threading.Lock()
+        self.entries: OrderedDict[str, _Entry] = OrderedDict()
+        self.spilling: dict[str, _Entry] = {}
+        self.estimated_bytes = 0
+        self.stats = CartStoreStats()
+
+
+def estimate_cart_bytes(cart: ShoppingCart) -> int:
+    """
+    Estimate how much memory a cart holds.
+
+    Args:
+        cart: Cart to measure
+
+    Returns:
+        Approximate size in bytes
+    """
+    return CART_OVERHEAD_BYTES + LINE_OVERHEAD_BYTES * len(cart)
+
+
+class CartStore:
+    """
+    Session-keyed cart store with sharded locks, idle TTL and a memory budget.
+
+    Each shard may use memory_budget / shards bytes; when a write or a sweep
+    finds a shard over its share, its least recently used carts are evicted. Evicted
+    carts are passed to the spill hook, if any, outside the shard lock;
+    spills and restores of one shard run one at a time.
+    """
+
+    def __init__(self, shards: int = DEFAULT_SHARDS,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 spill: Optional[CartSpill] = None,
+                 cart_factory: Callable[[], ShoppingCart] = ThreadSafeShoppingCart,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if shards < 1:
+            raise ValueError(f"Shard count must be at least 1, got {shards}")
+        self.ttl_seconds = ttl_seconds
+        self.memory_budget = memory_budget
+        self._shard_budget = memory_budget // shards
+        self._shards = [_Shard() for _ in range(shards)]
+        self._spill = spill
+        self._cart_factory = cart_factory
+        self._clock = clock
+
+    def _shard(self, session_id: str) -> _Shard:
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def _evict_locked(self, shard: _Shard, now: float) -> list[tuple[str, _Entry]]:
+        """Drop expired and over-budget entries from a shard whose lock is held."""
+        evicted = []
+        entries = shard.entries
+        pinned = 0
+        while len(entries) > pinned:
+            session_id, entry = next(iter(entries.items()))
+            if entry.pins:
+                # In use, so recently used: keep it and look past it.
+                entry.last_access = now
+                entries.move_to_end(session_id)
+                pinned += 1
+                continue
+            if now - entry.last_access > self.ttl_seconds:
+                shard.stats.ttl_evictions += 1
+            elif shard.estimated_bytes > self._shard_budget and len(entries) > 1:
+                shard.stats.memory_evictions += 1
+            else:
+                break
+            del entries[session_id]
+            shard.estimated_bytes -= entry.estimated_bytes
+            if self._spill is not None:
+                shard.spilling[session_id] = entry
+            evicted.append((session_id, entry))
+        return evicted
+
+    @staticmethod
+    def _remeasure_locked(shard: _Shard) -> None:
+        """Refresh the size estimate of every cart in a shard whose lock is held."""
+        total = 0
+        for entry in shard.entries.values():
+            entry.estimated_bytes = estimate_cart_bytes(entry.cart)
+            total += entry.estimated_bytes
+        shard.estimated_bytes = total
+
+    def _spill_all(self, shard: _Shard, evicted: list[tuple[str, _Entry]]) -> None:
+        """Write evicted entries out, skipping or discarding those taken back meanwhile."""
+        if self._spill is None or not evicted:
+            return
+        with shard.spill_lock:
+            for session_id, entry in evicted:
+                with shard.lock:
+                    if shard.spilling.get(session_id) is not entry:
+                        continue
+                self._spill.spill(session_id, entry.cart)
+                with shard.lock:
+                    if shard.spilling.get(session_id) is entry:
+                        del shard.spilling[session_id]
+                        continue
+                # Taken back by get() during the write; the file is stale.
+                self._spill.discard(session_id)
+
+    def _reclaim_locked(self, shard: _Shard, session_id: str, now: float) -> Optional[ShoppingCart]:
+        """Take back a cart whose spill has not finished, from a shard whose lock is held."""
+        entry = shard.spilling.pop(session_id, None)
+        if entry is None:
+            return None
+        self._store_locked(shard, session_id, entry.cart, now)
+        return entry.cart
+
+    def _store_locked(self, shard: _Shard, session_id: str,
+                      cart: ShoppingCart, now: float) -> None:
+        old = shard.entries.pop(session_id, None)
+        if old is not None:
+            shard.estimated_bytes -= old.estimated_bytes
+        # A spill still writing an older cart for this session is discarded once done.
+        shard.spilling.pop(session_id, None)
+        size = estimate_cart_bytes(cart)
+        shard.entries[session_id] = _Entry(cart, now, size)
+        shard.estimated_bytes += size
+
+    def _lookup(self, session_id: str, create: bool) -> Optional[ShoppingCart]:
+        """Find, take back, restore or (if create) make a session's cart."""
+        shard = self._shard(session_id)
+        now = self._clock()
+        with shard.lock:
+            evicted = self._evict_locked(shard, now)
+            entry = shard.entries.get(session_id)
+            if entry is not None:
+                shard.entries.move_to_end(session_id)
+                entry.last_access = now
+                # Carts change between requests; refresh the size estimate.
+                size = estimate_cart_bytes(entry.cart)
+                shard.estimated_bytes += size - entry.estimated_bytes
+                entry.estimated_bytes = size
+                shard.stats.hits += 1
+                cart = entry.cart
+            else:
+                cart = self._reclaim_locked(shard, session_id, now)
+                if cart is not None:
+                    shard.stats.hits += 1
+                else:
+                    shard.stats.misses += 1
+        self._spill_all(shard, evicted)
+        if cart is not None or (self._spill is None and not create):
+            return cart
+
+        # Holding spill_lock, no spill of this shard can finish, so the session
+        # is either in memory or fully written out.
+        evicted = []
+        with shard.spill_lock:
+            with shard.lock:
+                entry = shard.entries.get(session_id)
+                if entry is not None:
+                    return entry.cart
+                cart = self._reclaim_locked(shard, session_id, now)
+                if cart is not None:
+                    return cart
+            if self._spill is not None:
+                cart = self._spill.restore(session_id, self._cart_factory)
+            if cart is not None or create:
+                with shard.lock:
+                    if cart is not None:
+                        shard.stats.restored += 1
+                    else:
+                        cart = self._cart_factory()
+                    self._store_locked(shard, session_id, cart, now)
+                    evicted = self._evict_locked(shard, now)
+        self._spill_all(shard, evicted)
+        return cart
+
+    def get(self, session_id: str) -> Optional[ShoppingCart]:
+        """
+        Look up a session's cart and mark it as recently used.
+
+        Misses fall through to the spill hook, so spilled carts come back
+        transparently.
+
+        Args:
+            session_id: Session key
+
+        Returns:
+            The cart, or None if the session has no cart
+        """
+        return self._lookup(session_id, create=False)
+
+    def get_or_create(self, session_id: str) -> ShoppingCart:
+        """
+        Return the session's cart, creating an empty one if needed.
+
+        Args:
+            session_id: Session key
+
+        Returns:
+            The existing, restored or newly created cart
+        """
+        return self._lookup(session_id, create=True)
+
+    @contextmanager
+    def checkout(self, session_id: str) -> Iterator[ShoppingCart]:
+        """
+        Hold a session's cart, creating it if needed, so it is not evicted while in use.
+
+        Args:
+            session_id: Session key
+
+        Yields:
+            The session's cart
+        """
+        shard = self._shard(session_id)
+        while True:
+            cart = self.get_or_create(session_id)
+            with shard.lock:
+                entry = shard.entries.get(session_id)
+                if entry is not None and entry.cart is cart:
+                    entry.pins += 1
+                    break
+            # Evicted or replaced between the lookup and the pin; look again.
+        try:
+            yield cart
+        finally:
+            now = self._clock()
+            with shard.lock:
+                entry.pins -= 1
+                if shard.entries.get(session_id) is entry:
+                    entry.last_access = now
+                    shard.entries.move_to_end(session_id)
+                    size = estimate_cart_bytes(cart)
+                    shard.estimated_bytes += size - entry.estimated_bytes
+                    entry.estimated_bytes = size
+                    evicted = self._evict_locked(shard, now)
+                else:
+                    evicted = []
+            self._spill_all(shard, evicted)
+
+    def put(self, session_id: str, cart: ShoppingCart) -> None:
+        """
+        Store or replace a session's cart.
+
+        Args:
+            session_id: Session key
+            cart: Cart to store
+        """
+        shard = self._shard(session_id)
+        now = self._clock()
+        with shard.lock:
+            self._store_locked(shard, session_id, cart, now)
+            evicted = self._evict_locked(shard, now)
+        self._spill_all(shard, evicted)
+
+    def pop(self, session_id: str) -> Optional[ShoppingCart]:
+        """
+        Remove a session's cart without spilling it.
+
+        Args:
+            session_id: Session key
+
+        Returns:
+            The removed cart, or None if there was none
+        """
+        shard = self._shard(session_id)
+        with shard.lock:
+            entry = shard.entries.pop(session_id, None)
+            if entry is None:
+                spilling = shard.spilling.pop(session_id, None)
+                return spilling.cart if spilling is not None else None
+            shard.estimated_bytes -= entry.estimated_bytes
+            return entry.cart
+
+    def evict_expired(self) -> int:
+        """
+        Sweep every shard for idle and over-budget carts.
+
+        Carts grow after they are handed out, and their size is otherwise
+        only measured when they are looked up, stored or checked back in, so
+        the sweep measures every cart again before enforcing the budget. Run
+        it periodically.
+
+        Returns:
+            Number of carts evicted
+        """
+        now = self._clock()
+        count = 0
+        for shard in self._shards:
+            with shard.lock:
+                self._remeasure_locked(shard)
+                evicted = self._evict_locked(shard, now)
+            self._spill_all(shard, evicted)
+            count += len(evicted)
+        return count
+
+    def stats(self) -> CartStoreStats:
+        """
+        Aggregate the counters of all shards.
+
+        Returns:
+            A snapshot of the store counters
+        """
+        total = CartStoreStats()
+        for shard in self._shards:
+            with shard.lock:
+                total.carts += len(shard.entries)
+                total.estimated_bytes += shard.estimated_bytes
+                total.hits += shard.stats.hits
+                total.misses += shard.stats.misses
+                total.restored += shard.stats.restored
+                total.ttl_evictions += shard.stats.ttl_evictions
+                total.memory_evictions += shard.stats.memory_evictions
+        return total
+
+    def __len__(self) -> int:
+        """Return the number of carts held in memory."""
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def __contains__(self, session_id: object) -> bool:
+        """Check whether a session's cart is held in memory."""
+        if not isinstance(session_id, str):
+            return False
+        shard = self._shard(session_id)
+        with shard.lock:
+            return session_id in shard.entries
+
+
+def main() -> None:
+    """
+    Demonstrate TTL and memory-budget eviction with spilling to disk.
+    """
+    import logging
+    import tempfile
+
+    logging.disable(logging.INFO)
+    now = [0.0]
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = CartStore(shards=4, ttl_seconds=60, memory_budget=4 * 20_000,
+                          spill=DirectorySpill(directory), clock=lambda: now[0])
+
+        for i in range(200):
+            with store.checkout(f"session-{i}") as cart:
+                cart.add_to_cart("Laptop", 1, 999.99)
+                cart.add_to_cart("Mouse", 1 + i % 3, 29.99)
+            now[0] += 0.1
+        print(f"After 200 sessions:  {store.stats()}")
+
+        # Filled after get_or_create, so only the sweep sees their real size.
+        for i in range(200, 260):
+            cart = store.get_or_create(f"session-{i}")
+            cart.add_to_cart("Laptop", 1, 999.99)
+            cart.add_to_cart("Mouse", 1, 29.99)
+        print(f"Before sweep:        {store.stats()}")
+        print(f"Evicted on sweep:    {store.evict_expired()}")
+        print(f"After sweep:         {store.stats()}")
+
+        restored = store.get("session-0")
+        print(f"session-0 restored from disk: {restored}")
+        assert isinstance(restored, ThreadSafeShoppingCart)
+        assert restored.get_totals() == (restored.get_total_cents(), restored.get_item_count())
+
+        # Restored carts come from the store's factory and keep their merge setting
+        events = CartEventLog(capacity=10)
+        merging = CartStore(shards=1, memory_budget=0, spill=DirectorySpill(directory),
+                            cart_factory=lambda: ShoppingCart(events=events, merge_duplicates=True))
+        merging.get_or_create("merging").add_to_cart("Cable", 1, 4.5)
+        merging.get_or_create("other")
+        restored = merging.get("merging")
+        restored.add_to_cart("cable", 2, 4.5)
+        assert type(restored) is ShoppingCart and restored.events is events
+        assert restored.merge_duplicates and len(restored) == 1
+
+        now[0] += 120
+        print(f"Expired on sweep:    {store.evict_expired()}")
+        print(f"After TTL sweep:     {store.stats()}")
+        print(f"Spilled files:       {len(os.listdir(directory))}")
+
+
+if __name__ == "__main__":
+    main()
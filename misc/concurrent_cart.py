@@ -0,0 +1,360 @@
+"""
+Concurrency-safe variants of ShoppingCart.
+
+ThreadSafeShoppingCart serializes writers on a per-cart lock and publishes
+the running totals as one immutable tuple after every mutation, so readers
+of get_total_payment / get_item_count never take the lock and never see a
+total that does not match the count.
+
+AsyncShoppingCart offers the same operations as coroutines for asyncio
+servers. Bulk inserts, compaction and every read that takes the cart lock
+(items, rendering) run in a worker thread so they do not block the event
+loop, even while another worker holds that lock.
+"""
+
+import asyncio
+import functools
+import logging
+import random
+import threading
+from typing import Any, Callable, Iterable, Mapping, Optional, TextIO, TypeVar
+
+from practice import (
+    CartEventLog,
+    CartItem,
+    CartTransaction,
+    ShoppingCart,
+    from_cents,
+)
+
+T = TypeVar("T")
+
+
+def _synchronized(method: Callable[..., T]) -> Callable[..., T]:
+    """Run a ShoppingCart method under the cart lock, then publish the totals."""
+    @functools.wraps(method)
+    def wrapper(self: "ThreadSafeShoppingCart", *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._totals = (self._total_cents, self._item_count)
+    return wrapper
+
+
+class ThreadSafeShoppingCart(ShoppingCart):
+    """
+    ShoppingCart that can be shared between threads.
+
+    Mutations and full-cart reads (items, printing) hold a re-entrant lock;
+    total and count reads are lock-free.
+    """
+
+    def __init__(self, items: Optional[Iterable[CartItem]] = None,
+                 events: Optional[CartEventLog] = None,
+                 merge_duplicates: bool = False) -> None:
+        self._lock = threading.RLock()
+        super().__init__(items, events, merge_duplicates)
+        self._totals = (self._total_cents, self._item_count)
+
+    @property
+    def items(self) -> tuple[CartItem, ...]:
+        """Snapshot of the cart lines in insertion order; read-only, edit through the cart."""
+        with self._lock:
+            return tuple(self._iter_lines())
+
+    add_to_cart = _synchronized(ShoppingCart.add_to_cart)
+    add_many = _synchronized(ShoppingCart.add_many)
+    _load_validated = _synchronized(ShoppingCart._load_validated)
+    remove_from_cart = _synchronized(ShoppingCart.remove_from_cart)
+    update_quantity = _synchronized(ShoppingCart.update_quantity)
+    clear_cart = _synchronized(ShoppingCart.clear_cart)
+    apply_changes = _synchronized(ShoppingCart.apply_changes)
+    compact = _synchronized(ShoppingCart.compact)
+    render = _synchronized(ShoppingCart.render)
+    print_shopping_cart = _synchronized(ShoppingCart.print_shopping_cart)
+
+    def get_totals(self) -> tuple[int, int]:
+        """
+        Read the total and the item count as one consistent pair.
+
+        Returns:
+            (total in cents, item count)
+        """
+        return self._totals
+
+    def get_item_count(self) -> int:
+        """Get the total number of items in the cart."""
+        return self._totals[1]
+
+    def get_total_cents(self) -> int:
+        """Get the total payment in exact integer cents."""
+        return self._totals[0]
+
+    def get_total_payment(self) -> float:
+        """Calculate the total payment for all items in the cart."""
+        return from_cents(self._totals[0])
+
+
+class AsyncShoppingCart:
+    """
+    asyncio-friendly cart with the ShoppingCart API as coroutines.
+
+    Mutations are serialized by an asyncio.Lock, which callers may also hold
+    themselves (``async with cart.lock``) to make a read-modify-write sequence
+    atomic across awaits. Lock-free reads (totals, counts, lookups) are plain
+    methods; reads of the whole cart are coroutines run in a worker thread.
+    """
+
+    def __init__(self, items: Optional[Iterable[CartItem]] = None,
+                 events: Optional[CartEventLog] = None,
+                 merge_duplicates: bool = False) -> None:
+        self._cart = ThreadSafeShoppingCart(items, events, merge_duplicates)
+        self.lock = asyncio.Lock()
+
+    async def items(self) -> tuple[CartItem, ...]:
+        """Snapshot of the cart lines in insertion order; read-only, edit through the cart."""
+        return await asyncio.to_thread(lambda: self._cart.items)
+
+    async def add_to_cart(self, item_name: str, item_quantity: int, item_price: float) -> None:
+        """Add a new item to the cart."""
+        async with self.lock:
+            self._cart.add_to_cart(item_name, item_quantity, item_price)
+
+    async def add_many(self, rows: Iterable[tuple[str, int, float]]) -> int:
+        """Add many items at once, all or nothing, without blocking the event loop."""
+        async with self.lock:
+            return await asyncio.to_thread(self._cart.add_many, list(rows))
+
+    async def add_columns(self, item_names: Iterable[str], item_quantities: Iterable[int],
+                          item_prices: Iterable[float]) -> int:
+        """Add many items from parallel columns, all or nothing, without blocking the event loop."""
+        async with self.lock:
+            return await asyncio.to_thread(self._cart.add_columns, list(item_names),
+                                           list(item_quantities), list(item_prices))
+
+    async def remove_from_cart(self, item_name: str) -> bool:
+        """Remove an item from the cart by name."""
+        async with self.lock:
+            return self._cart.remove_from_cart(item_name)
+
+    async def update_quantity(self, item_name: str, new_quantity: int) -> bool:
+        """Update the quantity of an existing item."""
+        async with self.lock:
+            return self._cart.update_quantity(item_name, new_quantity)
+
+    async def apply_changes(self, updates: Optional[Mapping[str, int]] = None,
+                            removals: Iterable[str] = ()) -> int:
+        """Apply many quantity updates and removals, all or nothing."""
+        async with self.lock:
+            return self._cart.apply_changes(updates, list(removals))
+
+    async def compact(self) -> int:
+        """Merge lines that share a name and a price, without blocking the event loop."""
+        async with self.lock:
+            return await asyncio.to_thread(self._cart.compact)
+
+    def transaction(self) -> "AsyncCartTransaction":
+        """Collect changes and apply them together when the ``async with`` block exits."""
+        return AsyncCartTransaction(self)
+
+    async def clear_cart(self) -> None:
+        """Remove all items from the cart."""
+        async with self.lock:
+            self._cart.clear_cart()
+
+    def apply_discount(self, discount_percent: float) -> float:
+        """Calculate total after applying a percentage discount."""
+        return self._cart.apply_discount(discount_percent)
+
+    def find_item(self, item_name: str) -> Optional[CartItem]:
+        """Find an item in the cart by name."""
+        return self._cart.find_item(item_name)
+
+    def get_totals(self) -> tuple[int, int]:
+        """Read the total in cents and the item count as one consistent pair."""
+        return self._cart.get_totals()
+
+    def get_item_count(self) -> int:
+        """Get the total number of items in the cart."""
+        return self._cart.get_item_count()
+
+    def get_total_payment(self) -> float:
+        """Calculate the total payment for all items in the cart."""
+        return self._cart.get_total_payment()
+
+    def get_total_cents(self) -> int:
+        """Get the total payment in exact integer cents."""
+        return self._cart.get_total_cents()
+
+    async def render(self, page: int = 1, page_size: Optional[int] = None) -> str:
+        """Render the cart summary into a single string, without blocking the event loop."""
+        return await asyncio.to_thread(self._cart.render, page, page_size)
+
+    async def print_shopping_cart(self, out: Optional[TextIO] = None, page: int = 1,
+                                  page_size: Optional[int] = None) -> None:
+        """Print a formatted summary of the shopping cart, without blocking the event loop."""
+        await asyncio.to_thread(self._cart.print_shopping_cart, out, page, page_size)
+
+    def is_empty(self) -> bool:
+        """Check if the cart is empty."""
+        return self._cart.is_empty()
+
+    def __len__(self) -> int:
+        """Return the number of unique items in the cart."""
+        return len(self._cart)
+
+    def __str__(self) -> str:
+        """String representation of the shopping cart."""
+        return str(self._cart)
+
+
+class AsyncCartTransaction:
+    """
+    Change set for AsyncShoppingCart, used with ``async with``.
+
+    Changes are recorded in a CartTransaction on the underlying cart and
+    committed while holding the async cart's lock.
+    """
+
+    def __init__(self, cart: AsyncShoppingCart) -> None:
+        self.cart = cart
+        self._changes = CartTransaction(cart._cart)
+
+    def update_quantity(self, item_name: str, new_quantity: int) -> None:
+        """Record a quantity update."""
+        self._changes.update_quantity(item_name, new_quantity)
+
+    def remove_from_cart(self, item_name: str) -> None:
+        """Record a removal."""
+        self._changes.remove_from_cart(item_name)
+
+    async def commit(self) -> int:
+        """Apply the recorded changes and reset the change set."""
+        async with self.cart.lock:
+            return self._changes.commit()
+
+    async def __aenter__(self) -> "AsyncCartTransaction":
+        return self
+
+    async def __aexit__(self, exc_type: Optional[type], *exc_info: object) -> None:
+        if exc_type is None:
+            await self.commit()
+
+
+def check_invariants(cart: ShoppingCart) -> None:
+    """
+    Verify that a cart's running totals and name index match its lines.
+
+    Raises:
+        AssertionError: If any invariant is broken
+    """
+    items = cart.items
+    assert cart.get_total_cents() == sum(item.get_subtotal_cents() for item in items)
+    assert cart.get_item_count() == sum(item.item_quantity for item in items)
+    indexed = 0
+    for item in items:
+        entry = cart._index[cart._key(item.item_name)]
+        group = entry if isinstance(entry, list) else [entry]
+        assert any(other is item for other in group)
+        indexed += 1
+    assert indexed == sum(len(e) if isinstance(e, list) else 1 for e in cart._index.values())
+
+
+def stress(threads: int = 8, operations: int = 20_000) -> None:
+    """
+    Hammer one ThreadSafeShoppingCart from many threads and check invariants.
+
+    Args:
+        threads: Number of writer threads (one extra thread reads totals)
+        operations: Operations per writer thread
+    """
+    cart = ThreadSafeShoppingCart(events=CartEventLog(capacity=1000))
+    names = [f"Product-{i}" for i in range(50)]
+    stop = threading.Event()
+    failures: list[BaseException] = []
+
+    def writer(seed: int) -> None:
+        rng = random.Random(seed)
+        try:
+            for _ in range(operations):
+                name = rng.choice(names)
+                action = rng.random()
+                if action < 0.4:
+                    cart.add_to_cart(name, rng.randint(1, 5), rng.choice((1.99, 9.99, 24.5)))
+                elif action < 0.7:
+                    cart.update_quantity(name.upper(), rng.randint(1, 10))
+                elif action < 0.98:
+                    cart.remove_from_cart(name.lower())
+                else:
+                    cart.add_many([(name, 1, 0.99), (rng.choice(names), 2, 1.49)])
+        except BaseException as e:
+            failures.append(e)
+
+    def reader() -> None:
+        try:
+            while not stop.is_set():
+                total_cents, item_count = cart.get_totals()
+                assert total_cents >= 0 and item_count >= 0
+                assert (total_cents == 0) == (item_count == 0)
+        except BaseException as e:
+            failures.append(e)
+
+    workers = [threading.Thread(target=writer, args=(seed,)) for seed in range(threads)]
+    watcher = threading.Thread(target=reader)
+    watcher.start()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    stop.set()
+    watcher.join()
+
+    if failures:
+        raise failures[0]
+    check_invariants(cart)
+    print(f"✓ {threads} threads x {operations:,} ops: {len(cart)} lines, "
+          f"{cart.get_item_count()} items, ${cart.get_total_payment():.2f}")
+
+
+async def _async_demo() -> None:
+    """Run concurrent coroutines against one AsyncShoppingCart."""
+    cart = AsyncShoppingCart(events=CartEventLog(capacity=1000))
+
+    async def shopper(index: int) -> None:
+        await cart.add_to_cart(f"Item-{index % 10}", 1, 5.0)
+        await asyncio.sleep(0)
+        await cart.update_quantity(f"item-{index % 10}", 2)
+
+    await asyncio.gather(*(shopper(i) for i in range(1000)))
+    await cart.add_many((f"Bulk-{i}", 1, 1.0) for i in range(10_000))
+    await cart.add_columns(["Bulk-0", "Bulk-1"], [1, 1], [1.0, 1.0])
+    async with cart.transaction() as tx:
+        tx.update_quantity("Bulk-2", 3)
+        tx.remove_from_cart("Bulk-3")
+    await cart.compact()
+    check_invariants(cart._cart)
+    # Whole-cart reads wait for the bulk insert in a worker, not on the event loop
+    adding = asyncio.create_task(cart.add_many((f"Late-{i}", 1, 1.0) for i in range(10_000)))
+    ticks = 0
+    while not adding.done():
+        ticks += 1
+        await asyncio.sleep(0)
+    await adding
+    lines = await cart.items()
+    assert len(lines) == len(cart)
+    summary = await cart.render(page_size=5)
+    assert summary
+    print(f"✓ asyncio: {len(cart)} lines, ${cart.get_total_payment():.2f}, "
+          f"loop ran {ticks} times during a bulk insert")
+
+
+def main() -> None:
+    """Run the thread stress test and the asyncio demo."""
+    logging.disable(logging.WARNING)
+    stress()
+    asyncio.run(_async_demo())
+
+
+if __name__ == "__main__":
+    main()
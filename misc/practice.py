@@ -5,16 +5,18 @@ This module provides a production-ready implementation of a shopping cart
 with full CRUD operations, validation, and error handling.
 """
 
+from collections import deque
 from dataclasses import dataclass, field
-from decimal import Decimal
-from typing import Optional
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, TextIO, TypeVar, Union
+import atexit
 import logging
+import random
+import sys
+import threading
+import time
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # Constants
@@ -23,6 +25,12 @@ MIN_PRICE = 0.01
 MAX_PRICE = 999999.99
 MAX_DISCOUNT = 100.0
 MIN_DISCOUNT = 0.0
+CENTS_PER_UNIT = 100
+# Largest distance from a whole number of cents still treated as float noise
+PRICE_CENTS_TOLERANCE = 1e-6
+EVENT_BUFFER_SIZE = 100_000
+RENDER_CHUNK_LINES = 1000
+CHANGE_LOG_SIZE = 1024
 
 
 class ShoppingCartError(Exception):
@@ -50,38 +58,329 @@ class InvalidDiscountError(ShoppingCartError):
     pass
 
 
-@dataclass
+class BulkValidationError(ShoppingCartError):
+    """
+    Raised when one or more rows of a bulk insert are invalid.
+
+    Attributes:
+        errors: (row index, message) pairs for every rejected row
+    """
+
+    def __init__(self, errors: list[tuple[int, str]]) -> None:
+        self.errors = errors
+        details = "; ".join(f"row {row}: {message}" for row, message in errors[:10])
+        more = f" (+{len(errors) - 10} more)" if len(errors) > 10 else ""
+        super().__init__(f"{len(errors)} invalid row(s): {details}{more}")
+
+
+class ChangeSetError(ShoppingCartError):
+    """
+    Raised when a batch of cart changes is rejected; nothing was applied.
+
+    Attributes:
+        errors: Message per offending item name
+    """
+
+    def __init__(self, errors: dict[str, str]) -> None:
+        self.errors = errors
+        details = "; ".join(f"{name}: {message}" for name, message in list(errors.items())[:10])
+        more = f" (+{len(errors) - 10} more)" if len(errors) > 10 else ""
+        super().__init__(f"{len(errors)} invalid change(s): {details}{more}")
+
+
+class CartEventLog:
+    """
+    Structured, sampled audit trail for cart events.
+
+    Events are recorded as (timestamp, event, fields) tuples in a bounded ring
+    buffer; nothing is formatted until the buffer is flushed to the logger,
+    which can happen on a background thread. When the buffer is full the
+    oldest events are dropped and counted, and the next flush logs a warning
+    with the count.
+
+    Events only reach the logger when flush() runs: call start_flusher(), or
+    flush() yourself. The module-wide cart_events is also flushed at exit.
+
+    Attributes:
+        sample_rates: Per-event sampling rate between 0.0 and 1.0
+        default_rate: Sampling rate for events without an explicit rate
+        dropped: Number of events dropped because the buffer was full
+    """
+
+    def __init__(self, capacity: int = EVENT_BUFFER_SIZE,
+                 sample_rates: Optional[dict[str, float]] = None,
+                 default_rate: float = 1.0,
+                 sink: logging.Logger = logger) -> None:
+        self.sample_rates = dict(sample_rates or {})
+        self.default_rate = default_rate
+        self._buffer: deque[tuple[float, str, dict[str, Any]]] = deque(maxlen=capacity)
+        self._sink = sink
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """
+        Record an event, subject to its sampling rate.
+
+        Args:
+            event: Event name, e.g. "add" or "remove"
+            **fields: Raw event data; formatted only on flush
+        """
+        rate = self.sample_rates.get(event, self.default_rate)
+        if rate < 1.0 and random.random() >= rate:
+            return
+        buffer = self._buffer
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append((time.time(), event, fields))
+
+    def drain(self) -> list[tuple[float, str, dict[str, Any]]]:
+        """
+        Remove and return all buffered events, oldest first.
+
+        Returns:
+            The drained (timestamp, event, fields) tuples
+        """
+        drained = []
+        popleft = self._buffer.popleft
+        while True:
+            try:
+                drained.append(popleft())
+            except IndexError:
+                return drained
+
+    def flush(self) -> int:
+        """
+        Write all buffered events to the logger at INFO level.
+
+        Returns:
+            Number of events drained from the buffer
+        """
+        events = self.drain()
+        dropped = self.dropped
+        if dropped > self._reported_dropped:
+            self._sink.warning("cart event buffer full: %d event(s) dropped",
+                               dropped - self._reported_dropped)
+            self._reported_dropped = dropped
+        if self._sink.isEnabledFor(logging.INFO):
+            for timestamp, event, fields in events:
+                self._sink.info("cart.%s %s", event, fields, extra={"event_time": timestamp})
+        return len(events)
+
+    def start_flusher(self, interval: float = 1.0) -> None:
+        """
+        Flush the buffer periodically on a daemon thread.
+
+        Args:
+            interval: Seconds between flushes
+        """
+        if self._flusher is not None:
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                self.flush()
+
+        self._flusher = threading.Thread(target=run, name="cart-event-flusher", daemon=True)
+        self._flusher.start()
+
+    def stop_flusher(self) -> None:
+        """Stop the background flusher and flush whatever is left."""
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    def __len__(self) -> int:
+        """Return the number of buffered events."""
+        return len(self._buffer)
+
+
+cart_events = CartEventLog()
+# Without a flusher, buffered events would otherwise be lost at exit
+atexit.register(cart_events.stop_flusher)
+
+
+def to_cents(amount: float) -> int:
+    """
+    Convert a money amount to exact integer cents.
+
+    The amount goes through its shortest decimal repr, so 29.99 becomes 2999
+    rather than picking up binary float error.
+
+    Args:
+        amount: Money amount in currency units
+
+    Returns:
+        The amount in cents, rounded half up
+    """
+    cents = Decimal(str(amount)) * CENTS_PER_UNIT
+    return int(cents.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> float:
+    """Convert integer cents back to a currency amount."""
+    return cents / CENTS_PER_UNIT
+
+
+def check_item(item_name: str, item_quantity: int, item_price: float) -> Optional[Exception]:
+    """
+    Check the attributes of a cart line without raising.
+
+    Returns:
+        The error validate_item would raise, or None if the line is valid
+    """
+    if not item_name or not item_name.strip():
+        return ValueError("Item name cannot be empty")
+
+    if item_quantity < MIN_QUANTITY:
+        return InvalidQuantityError(
+            f"Quantity must be at least {MIN_QUANTITY}, got {item_quantity}"
+        )
+
+    # Written so that NaN, which fails every comparison, is rejected too
+    if not MIN_PRICE <= item_price <= MAX_PRICE:
+        return InvalidPriceError(
+            f"Price must be between {MIN_PRICE} and {MAX_PRICE}, got {item_price}"
+        )
+
+    # Totals are kept in cents, so a price must be a whole number of them, up
+    # to float noise such as 9.99 + 7 == 16.990000000000002
+    cents = item_price * CENTS_PER_UNIT
+    if abs(cents - round(cents)) > PRICE_CENTS_TOLERANCE:
+        return InvalidPriceError(f"Price must be a whole number of cents, got {item_price}")
+    return None
+
+
+def validate_item(item_name: str, item_quantity: int, item_price: float) -> None:
+    """
+    Check the attributes of a cart line.
+
+    Raises:
+        ValueError: If the item name is empty
+        InvalidQuantityError: If the quantity is below MIN_QUANTITY
+        InvalidPriceError: If the price is outside [MIN_PRICE, MAX_PRICE],
+            NaN, or not a whole number of cents
+    """
+    error = check_item(item_name, item_quantity, item_price)
+    if error is not None:
+        raise error
+
+
+def discount_cents(total_cents: int, discount_percent: float) -> int:
+    """
+    Apply a percentage discount to a total in cents, rounding half up.
+
+    Raises:
+        InvalidDiscountError: If discount is outside [MIN_DISCOUNT, MAX_DISCOUNT]
+    """
+    if not MIN_DISCOUNT <= discount_percent <= MAX_DISCOUNT:
+        raise InvalidDiscountError(
+            f"Discount must be between {MIN_DISCOUNT}% and {MAX_DISCOUNT}%, got {discount_percent}%"
+        )
+    kept = Decimal(total_cents) * (100 - Decimal(str(discount_percent))) / 100
+    return int(kept.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+Line = TypeVar("Line")
+
+
+def resolve_changes(find: Callable[[str], Optional[Line]], key: Callable[[str], str],
+                    updates: Mapping[str, int],
+                    removals: Iterable[str]) -> tuple[list[tuple[Line, int]], list[Line]]:
+    """
+    Validate a change set for apply_changes, changing nothing.
+
+    Args:
+        find: Returns the line a name targets, or None
+        key: Normalizes a name the way the cart's index does
+        updates: New quantity per item name
+        removals: Names of items to remove
+
+    Returns:
+        (line, new quantity) pairs to update and lines to remove
+
+    Raises:
+        ChangeSetError: If any change is invalid; lists every problem
+    """
+    errors = {}
+    resolved_updates = []
+    resolved_removals = []
+
+    for item_name, new_quantity in updates.items():
+        item = find(item_name)
+        if item is None:
+            errors[item_name] = "Item not found"
+        elif new_quantity < MIN_QUANTITY:
+            errors[item_name] = f"Quantity must be at least {MIN_QUANTITY}, got {new_quantity}"
+        else:
+            resolved_updates.append((item, new_quantity))
+
+    updated = {key(item_name) for item_name in updates}
+    seen = set()
+    for item_name in removals:
+        name_key = key(item_name)
+        if name_key in updated:
+            errors[item_name] = "Item cannot be both updated and removed"
+        elif name_key in seen:
+            errors[item_name] = "Item listed for removal more than once"
+        else:
+            item = find(item_name)
+            if item is None:
+                errors[item_name] = "Item not found"
+            else:
+                resolved_removals.append(item)
+        seen.add(name_key)
+
+    if errors:
+        logger.error("Rejected cart change set: %d invalid change(s)", len(errors))
+        raise ChangeSetError(errors)
+    return resolved_updates, resolved_removals
+
+
+@dataclass(slots=True)
 class CartItem:
     """
     Represents a single item in the shopping cart.
+
+    The class is slotted, so items carry no per-instance __dict__.
     
     Attributes:
         item_name: Name of the product
         item_quantity: Quantity of the product (must be >= 1)
-        item_price: Price per unit (must be > 0)
+        item_price: Price per unit (a whole number of cents, must be > 0)
+        price_cents: Price per unit in exact integer cents (derived)
     """
     item_name: str
     item_quantity: int
     item_price: float
+    price_cents: int = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """Validate item attributes after initialization."""
         self._validate()
+        self.price_cents = to_cents(self.item_price)
+        # Store the validated price, so lines merged on price_cents share one price
+        self.item_price = from_cents(self.price_cents)
 
     def _validate(self) -> None:
         """Validate item attributes."""
-        if not self.item_name or not self.item_name.strip():
-            raise ValueError("Item name cannot be empty")
-
-        if self.item_quantity < MIN_QUANTITY:
-            raise InvalidQuantityError(
-                f"Quantity must be at least {MIN_QUANTITY}, got {self.item_quantity}"
-            )
+        validate_item(self.item_name, self.item_quantity, self.item_price)
 
-        if self.item_price < MIN_PRICE or self.item_price > MAX_PRICE:
-            raise InvalidPriceError(
-                f"Price must be between {MIN_PRICE} and {MAX_PRICE}, got {self.item_price}"
-            )
+    @classmethod
+    def _from_validated(cls, item_name: str, item_quantity: int,
+                        item_price: float, price_cents: int) -> "CartItem":
+        """Build an item from values that were already validated, skipping __post_init__."""
+        item = cls.__new__(cls)
+        item.item_name = item_name
+        item.item_quantity = item_quantity
+        item.item_price = item_price
+        item.price_cents = price_cents
+        return item
 
     def get_subtotal(self) -> float:
         """
@@ -90,22 +389,258 @@ class CartItem:
         Returns:
             The subtotal (quantity * price)
         """
-        return round(self.item_quantity * self.item_price, 2)
+        return from_cents(self.get_subtotal_cents())
+
+    def get_subtotal_cents(self) -> int:
+        """
+        Calculate the subtotal for this item in exact integer cents.
+
+        Returns:
+            The subtotal (quantity * price) in cents
+        """
+        return self.item_quantity * self.price_cents
 
     def __str__(self) -> str:
         """String representation of the cart item."""
         return f"{self.item_name} x{self.item_quantity} @ ${self.item_price:.2f} = ${self.get_subtotal():.2f}"
 
 
-@dataclass
+def render_chunks(lines: Iterable[tuple[str, int, float, int]], line_count: int,
+                  item_count: int, total_cents: int, page: int = 1,
+                  page_size: Optional[int] = None) -> Iterator[str]:
+    """
+    Render a cart summary as a sequence of text chunks.
+
+    Lines are formatted straight from the stored cents and grouped into
+    chunks of RENDER_CHUNK_LINES; only the requested page is formatted.
+
+    Args:
+        lines: (item_name, item_quantity, item_price, price_cents) per line,
+            in display order
+        line_count: Number of lines
+        item_count: Sum of the line quantities
+        total_cents: Cart total in cents
+        page: 1-based page number (only used with page_size)
+        page_size: Lines per page, or None to render every line
+
+    Yields:
+        Text chunks that concatenate to the full summary
+    """
+    if line_count == 0:
+        yield "\n🛒 Shopping Cart is empty\n"
+        return
+
+    if page < 1:
+        raise ValueError(f"Page must be at least 1, got {page}")
+    if page_size is not None and page_size < 1:
+        raise ValueError(f"Page size must be at least 1, got {page_size}")
+
+    if page_size is None:
+        start, stop = 0, line_count
+    else:
+        start = min((page - 1) * page_size, line_count)
+        stop = min(start + page_size, line_count)
+
+    yield f"\n{'=' * 60}\n🛒 SHOPPING CART\n{'=' * 60}\n"
+
+    chunk = []
+    for idx, (item_name, item_quantity, item_price, price_cents) in enumerate(
+            islice(lines, start, stop), start + 1):
+        chunk.append(
+            f"{idx}. {item_name} x{item_quantity} @ ${item_price:.2f}"
+            f" = ${from_cents(item_quantity * price_cents):.2f}\n"
+        )
+        if len(chunk) == RENDER_CHUNK_LINES:
+            yield "".join(chunk)
+            chunk.clear()
+    if chunk:
+        yield "".join(chunk)
+
+    footer = [f"{'-' * 60}\n"]
+    if page_size is not None:
+        pages = -(-line_count // page_size)
+        footer.append(f"Page {page}/{pages} (lines {start + 1}-{stop} of {line_count})\n")
+    footer.append(f"Total Items: {item_count}\n")
+    footer.append(f"Total Price: ${from_cents(total_cents):.2f}\n")
+    footer.append(f"{'=' * 60}\n")
+    yield "".join(footer)
+
+
 class ShoppingCart:
     """
     Manages a shopping cart with full CRUD operations.
-    
+
+    Lines are kept in an insertion-ordered list. A removed line stays in the
+    list as a tombstone (its identity is remembered in a set) until tombstones
+    make up half the list, when they are swept out in one pass. With a
+    case-folded name index on top, lookup and update are O(1) and removal is
+    amortized O(1), while each line costs the list only one pointer.
+    The total (in integer cents) and the item count are maintained as lines
+    change, so reading them is O(1) as well. Quantities must therefore be
+    changed through the cart, not on the CartItem directly.
+
+    With merge_duplicates, adding an item whose name (case-insensitively) and
+    price match an existing line folds the quantity into that line instead of
+    appending a new one.
+
+    Every change bumps `version` and is logged with the case-folded name it
+    touched, in a log of the last CHANGE_LOG_SIZE changes, so caches built on
+    the cart can ask what changed since they last looked (changed_since).
+
     Attributes:
-        items: List of CartItem objects in the cart
+        items: Read-only tuple of the CartItem objects in the cart
+        events: Event log that records cart mutations
+        merge_duplicates: Whether matching lines are merged on insert
+        version: Number of changes made to the cart so far
     """
-    items: list[CartItem] = field(default_factory=list)
+
+    def __init__(self, items: Optional[Iterable[CartItem]] = None,
+                 events: Optional[CartEventLog] = None,
+                 merge_duplicates: bool = False) -> None:
+        self.events = events if events is not None else cart_events
+        self.merge_duplicates = merge_duplicates
+        self._lines: list[CartItem] = []
+        # id() of the removed lines still sitting in _lines as tombstones
+        self._removed: set[int] = set()
+        # A name maps to its CartItem, or to a list of them only when the name repeats.
+        self._index: dict[str, Union[CartItem, list[CartItem]]] = {}
+        # Only maintained with merge_duplicates: (folded name, price cents) -> line.
+        self._merge_index: dict[tuple[str, int], CartItem] = {}
+        self._total_cents = 0
+        self._item_count = 0
+        self.version = 0
+        # (version, case-folded name) per change; None for a change to the whole cart
+        self._changes: deque[tuple[int, Optional[str]]] = deque(maxlen=CHANGE_LOG_SIZE)
+        # Copy the caller's items: the cart changes its lines in place and
+        # tracks removed ones by identity, so it must own them.
+        from_validated = CartItem._from_validated
+        for item in items or ():
+            self._insert(from_validated(item.item_name, item.item_quantity,
+                                        item.item_price, item.price_cents))
+
+    @property
+    def items(self) -> tuple[CartItem, ...]:
+        """Snapshot of the cart lines in insertion order; read-only, edit through the cart."""
+        return tuple(self._iter_lines())
+
+    def _iter_lines(self) -> Iterator[CartItem]:
+        """Iterate the live lines in insertion order, skipping tombstones."""
+        removed = self._removed
+        if not removed:
+            return iter(self._lines)
+        return (item for item in self._lines if id(item) not in removed)
+
+    @staticmethod
+    def _key(item_name: str) -> str:
+        """Normalize an item name for case-insensitive lookups."""
+        return item_name.casefold()
+
+    def _changed(self, key: Optional[str]) -> None:
+        """Record a change to the lines under one folded name, or to the whole cart (None)."""
+        self.version += 1
+        self._changes.append((self.version, key))
+
+    def changed_since(self, version: int) -> Optional[set[str]]:
+        """
+        Get the case-folded names whose lines changed after a given version.
+
+        Args:
+            version: A value of `version` read earlier
+
+        Returns:
+            The changed names, or None when they are unknown: the change log
+            no longer reaches back that far, or the whole cart changed
+        """
+        changes = self._changes
+        if version == self.version:
+            return set()
+        if not changes or changes[0][0] > version + 1:
+            return None
+        names = set()
+        for changed_version, key in reversed(changes):
+            if changed_version <= version:
+                break
+            if key is None:
+                return None
+            names.add(key)
+        return names
+
+    def names(self) -> Iterator[str]:
+        """Iterate the case-folded names of the lines in the cart, once each."""
+        return iter(self._index)
+
+    def find_all(self, item_name: str) -> tuple[CartItem, ...]:
+        """
+        Find every line with a name, case-insensitively.
+
+        Args:
+            item_name: Name of the product to find
+
+        Returns:
+            The matching lines in insertion order (empty if none)
+        """
+        entry = self._index.get(self._key(item_name))
+        if entry is None:
+            return ()
+        return tuple(entry) if isinstance(entry, list) else (entry,)
+
+    def _insert(self, item: CartItem) -> CartItem:
+        """
+        Store a line and register it in the name index.
+
+        Returns:
+            The line now holding the item: an existing line it was merged
+            into, or the item itself
+        """
+        key = self._key(item.item_name)
+        if self.merge_duplicates:
+            merge_key = (key, item.price_cents)
+            existing = self._merge_index.get(merge_key)
+            if existing is not None:
+                existing.item_quantity += item.item_quantity
+                self._total_cents += item.get_subtotal_cents()
+                self._item_count += item.item_quantity
+                self._changed(key)
+                return existing
+            self._merge_index[merge_key] = item
+
+        self._lines.append(item)
+        entry = self._index.get(key)
+        if entry is None:
+            self._index[key] = item
+        elif isinstance(entry, list):
+            entry.append(item)
+        else:
+            self._index[key] = [entry, item]
+        self._total_cents += item.get_subtotal_cents()
+        self._item_count += item.item_quantity
+        self._changed(key)
+        return item
+
+    def _discard(self, item: CartItem) -> None:
+        """Drop a line from storage and from the name index."""
+        removed = self._removed
+        removed.add(id(item))
+        if 2 * len(removed) > len(self._lines):
+            self._lines[:] = [line for line in self._lines if id(line) not in removed]
+            removed.clear()
+        key = self._key(item.item_name)
+        merge_key = (key, item.price_cents)
+        if self._merge_index.get(merge_key) is item:
+            del self._merge_index[merge_key]
+        entry = self._index[key]
+        if isinstance(entry, list):
+            for position, other in enumerate(entry):
+                if other is item:
+                    del entry[position]
+                    break
+            if len(entry) == 1:
+                self._index[key] = entry[0]
+        else:
+            del self._index[key]
+        self._total_cents -= item.get_subtotal_cents()
+        self._item_count -= item.item_quantity
+        self._changed(key)
 
     def add_to_cart(self, item_name: str, item_quantity: int, item_price: float) -> None:
         """
@@ -123,12 +658,127 @@ class ShoppingCart:
         """
         try:
             cart_item = CartItem(item_name, item_quantity, item_price)
-            self.items.append(cart_item)
-            logger.info(f"Added to cart: {cart_item}")
+            self._insert(cart_item)
+            self.events.emit("add", name=item_name, quantity=item_quantity,
+                             price_cents=cart_item.price_cents)
         except (InvalidQuantityError, InvalidPriceError, ValueError) as e:
-            logger.error(f"Failed to add item '{item_name}': {e}")
+            logger.error("Failed to add item '%s': %s", item_name, e)
             raise
 
+    def add_many(self, rows: Iterable[tuple[str, int, float]]) -> int:
+        """
+        Add many items at once, all or nothing.
+
+        Every row is validated in a single pass before anything is inserted,
+        and the whole batch is reported with one log record.
+
+        Args:
+            rows: (item_name, item_quantity, item_price) tuples
+
+        Returns:
+            Number of rows added (rows merged into existing lines included)
+
+        Raises:
+            BulkValidationError: If any row is invalid; lists every bad row
+        """
+        validated = []
+        errors = []
+        # One validated (price, cents) pair per distinct input price, shared by its lines
+        prices: dict[float, tuple[float, int]] = {}
+
+        for row, (item_name, item_quantity, item_price) in enumerate(rows):
+            error = check_item(item_name, item_quantity, item_price)
+            if error is not None:
+                errors.append((row, str(error)))
+            elif not errors:
+                price = prices.get(item_price)
+                if price is None:
+                    price_cents = to_cents(item_price)
+                    price = prices[item_price] = (from_cents(price_cents), price_cents)
+                validated.append((item_name, item_quantity, *price))
+
+        if errors:
+            logger.error("Rejected bulk insert: %d invalid row(s)", len(errors))
+            raise BulkValidationError(errors)
+
+        from_validated = CartItem._from_validated
+        if self.merge_duplicates:
+            total_before, count_before = self._total_cents, self._item_count
+            for row in validated:
+                self._insert(from_validated(*row))
+            total_cents = self._total_cents - total_before
+            item_count = self._item_count - count_before
+            self.events.emit("add_many", lines=len(validated), quantity=item_count,
+                             total_cents=total_cents)
+            return len(validated)
+
+        # Same bookkeeping as _insert, inlined with local lookups for the hot loop.
+        append_line = self._lines.append
+        index = self._index
+        total_cents = item_count = 0
+        for item_name, item_quantity, item_price, price_cents in validated:
+            item = from_validated(item_name, item_quantity, item_price, price_cents)
+            append_line(item)
+            key = item_name.casefold()
+            entry = index.get(key)
+            if entry is None:
+                index[key] = item
+            elif isinstance(entry, list):
+                entry.append(item)
+            else:
+                index[key] = [entry, item]
+            total_cents += item_quantity * price_cents
+            item_count += item_quantity
+        self._total_cents += total_cents
+        self._item_count += item_count
+        if len(validated) > CHANGE_LOG_SIZE:
+            self._changed(None)
+        else:
+            for row in validated:
+                self._changed(row[0].casefold())
+
+        self.events.emit("add_many", lines=len(validated), quantity=item_count,
+                         total_cents=total_cents)
+        return len(validated)
+
+    def _load_validated(self, lines: Iterable[tuple[str, int, float, int]]) -> int:
+        """
+        Insert lines that were validated before, e.g. read back from a snapshot.
+
+        Nothing is validated again and no event is emitted.
+
+        Args:
+            lines: (item_name, item_quantity, item_price, price_cents) tuples
+
+        Returns:
+            Number of lines inserted (lines merged into existing ones included)
+        """
+        from_validated = CartItem._from_validated
+        count = 0
+        for line in lines:
+            self._insert(from_validated(*line))
+            count += 1
+        return count
+
+    def add_columns(self, item_names: Iterable[str], item_quantities: Iterable[int],
+                    item_prices: Iterable[float]) -> int:
+        """
+        Add many items from parallel columns, all or nothing.
+
+        Args:
+            item_names: Product names
+            item_quantities: Quantities, aligned with item_names
+            item_prices: Prices per unit, aligned with item_names
+
+        Returns:
+            Number of lines added
+
+        Raises:
+            BulkValidationError: If any row is invalid
+            ValueError: If the columns have different lengths
+        """
+        return self.add_many(zip(item_names, item_quantities, item_prices, strict=True))
+
     def remove_from_cart(self, item_name: str) -> bool:
         """
         Remove an item from the cart by name.
@@ -139,13 +789,13 @@ class ShoppingCart:
         Returns:
             True if item was found and removed, False otherwise
         """
-        for item in self.items:
-            if item.item_name.lower() == item_name.lower():
-                self.items.remove(item)
-                logger.info(f"Removed from cart: {item_name}")
-                return True
+        item = self.find_item(item_name)
+        if item is not None:
+            self._discard(item)
+            self.events.emit("remove", name=item_name)
+            return True
 
-        logger.warning(f"Item not found for removal: {item_name}")
+        logger.warning("Item not found for removal: %s", item_name)
         return False
 
     def update_quantity(self, item_name: str, new_quantity: int) -> bool:
@@ -167,16 +817,102 @@ class ShoppingCart:
                 f"Quantity must be at least {MIN_QUANTITY}, got {new_quantity}"
             )
 
-        for item in self.items:
-            if item.item_name.lower() == item_name.lower():
-                old_quantity = item.item_quantity
-                item.item_quantity = new_quantity
-                logger.info(f"Updated quantity for '{item_name}': {old_quantity} -> {new_quantity}")
-                return True
+        item = self.find_item(item_name)
+        if item is not None:
+            old_quantity = item.item_quantity
+            item.item_quantity = new_quantity
+            self._total_cents += (new_quantity - old_quantity) * item.price_cents
+            self._item_count += new_quantity - old_quantity
+            self._changed(self._key(item.item_name))
+            self.events.emit("update", name=item_name, old_quantity=old_quantity,
+                             new_quantity=new_quantity)
+            return True
 
-        logger.warning(f"Item not found for quantity update: {item_name}")
+        logger.warning("Item not found for quantity update: %s", item_name)
         return False
 
+    def apply_changes(self, updates: Optional[Mapping[str, int]] = None,
+                      removals: Iterable[str] = ()) -> int:
+        """
+        Apply many quantity updates and removals, all or nothing.
+
+        The whole change set is validated first; if any name is missing, any
+        quantity is invalid or a name is both updated and removed, nothing
+        is changed. Like update_quantity and remove_from_cart, each name
+        targets the first matching line.
+
+        Args:
+            updates: New quantity per item name
+            removals: Names of items to remove
+
+        Returns:
+            Number of lines changed or removed
+
+        Raises:
+            ChangeSetError: If any change is invalid; lists every problem
+        """
+        resolved_updates, resolved_removals = resolve_changes(
+            self.find_item, self._key, updates or {}, removals)
+
+        for item, new_quantity in resolved_updates:
+            delta = new_quantity - item.item_quantity
+            item.item_quantity = new_quantity
+            self._total_cents += delta * item.price_cents
+            self._item_count += delta
+            self._changed(self._key(item.item_name))
+        for item in resolved_removals:
+            self._discard(item)
+
+        self.events.emit("apply_changes", updated=len(resolved_updates),
+                         removed=len(resolved_removals))
+        return len(resolved_updates) + len(resolved_removals)
+
+    def compact(self) -> int:
+        """
+        Merge lines that share a name (case-insensitively) and a price.
+
+        Quantities are folded into the first such line and the others are
+        removed. Use this once on carts built before merge_duplicates was
+        turned on; the merge index is rebuilt along the way.
+
+        Returns:
+            Number of lines merged away
+        """
+        first_lines: dict[tuple[str, int], CartItem] = {}
+        duplicates = []
+        for item in self._iter_lines():
+            merge_key = (self._key(item.item_name), item.price_cents)
+            first = first_lines.setdefault(merge_key, item)
+            if first is not item:
+                duplicates.append((first, item))
+
+        for first, item in duplicates:
+            self._discard(item)
+            first.item_quantity += item.item_quantity
+            self._total_cents += item.get_subtotal_cents()
+            self._item_count += item.item_quantity
+            self._changed(self._key(first.item_name))
+
+        if self.merge_duplicates:
+            self._merge_index = first_lines
+        if duplicates:
+            self.events.emit("compact", merged=len(duplicates))
+        return len(duplicates)
+
+    def transaction(self) -> "CartTransaction":
+        """
+        Collect changes and apply them together when the block exits.
+
+        Example:
+            with cart.transaction() as tx:
+                tx.update_quantity("Mouse", 3)
+                tx.remove_from_cart("Keyboard")
+
+        Returns:
+            A CartTransaction bound to this cart
+        """
+        return CartTransaction(self)
+
     def get_item_count(self) -> int:
         """
         Get the total number of items in the cart.
@@ -184,7 +920,7 @@ class ShoppingCart:
         Returns:
             Sum of all item quantities
         """
-        return sum(item.item_quantity for item in self.items)
+        return self._item_count
 
     def get_total_payment(self) -> float:
         """
@@ -193,7 +929,16 @@ class ShoppingCart:
         Returns:
             Total price of all items
         """
-        return round(sum(item.get_subtotal() for item in self.items), 2)
+        return from_cents(self._total_cents)
+
+    def get_total_cents(self) -> int:
+        """
+        Get the total payment for all items in exact integer cents.
+
+        Returns:
+            Total price of all items in cents
+        """
+        return self._total_cents
 
     def apply_discount(self, discount_percent: float) -> float:
         """
@@ -208,14 +953,11 @@ class ShoppingCart:
         Raises:
             InvalidDiscountError: If discount is invalid
         """
-        if not MIN_DISCOUNT <= discount_percent <= MAX_DISCOUNT:
-            raise InvalidDiscountError(
-                f"Discount must be between {MIN_DISCOUNT}% and {MAX_DISCOUNT}%, got {discount_percent}%"
-            )
-
-        total = self.get_total_payment()
-        discounted_total = round(total * (1 - discount_percent / 100), 2)
-        logger.info(f"Applied {discount_percent}% discount: ${total:.2f} -> ${discounted_total:.2f}")
+        total_cents = self.get_total_cents()
+        total = from_cents(total_cents)
+        discounted_total = from_cents(discount_cents(total_cents, discount_percent))
+        self.events.emit("discount", percent=discount_percent, total=total,
+                         discounted_total=discounted_total)
         return discounted_total
 
     def find_item(self, item_name: str) -> Optional[CartItem]:
@@ -228,10 +970,10 @@ class ShoppingCart:
         Returns:
             CartItem if found, None otherwise
         """
-        for item in self.items:
-            if item.item_name.lower() == item_name.lower():
-                return item
-        return None
+        entry = self._index.get(self._key(item_name))
+        if isinstance(entry, list):
+            return entry[0]
+        return entry
 
     def is_empty(self) -> bool:
         """
@@ -240,49 +982,133 @@ class ShoppingCart:
         Returns:
             True if cart has no items, False otherwise
         """
-        return len(self.items) == 0
+        return len(self) == 0
 
     def clear_cart(self) -> None:
         """
         Remove all items from the cart.
         """
-        item_count = len(self.items)
-        self.items.clear()
-        logger.info(f"Cart cleared. Removed {item_count} items")
+        item_count = len(self)
+        self._lines.clear()
+        self._removed.clear()
+        self._index.clear()
+        self._merge_index.clear()
+        self._total_cents = 0
+        self._item_count = 0
+        self._changed(None)
+        self.events.emit("clear", lines=item_count)
 
-    def print_shopping_cart(self) -> None:
+    def _render_chunks(self, page: int = 1, page_size: Optional[int] = None) -> Iterator[str]:
         """
-        Print a formatted summary of the shopping cart.
+        Render the cart summary as a sequence of text chunks.
+
+        Args:
+            page: 1-based page number (only used with page_size)
+            page_size: Lines per page, or None to render every line
+
+        Yields:
+            Text chunks that concatenate to the full summary
         """
-        if self.is_empty():
-            print("\n🛒 Shopping Cart is empty")
-            return
+        lines = ((item.item_name, item.item_quantity, item.item_price, item.price_cents)
+                 for item in self._iter_lines())
+        return render_chunks(lines, len(self), self.get_item_count(),
+                             self.get_total_cents(), page, page_size)
 
-        print("\n" + "=" * 60)
-        print("🛒 SHOPPING CART")
-        print("=" * 60)
+    def render(self, page: int = 1, page_size: Optional[int] = None) -> str:
+        """
+        Render the cart summary into a single string.
 
-        for idx, item in enumerate(self.items, 1):
-            print(f"{idx}. {item}")
+        Args:
+            page: 1-based page number (only used with page_size)
+            page_size: Lines per page, or None to render every line
 
-        print("-" * 60)
-        print(f"Total Items: {self.get_item_count()}")
-        print(f"Total Price: ${self.get_total_payment():.2f}")
-        print("=" * 60)
+        Returns:
+            The formatted summary
+        """
+        return "".join(self._render_chunks(page, page_size))
+
+    def print_shopping_cart(self, out: Optional[TextIO] = None, page: int = 1,
+                            page_size: Optional[int] = None) -> None:
+        """
+        Print a formatted summary of the shopping cart.
+
+        Output is written in buffered chunks, so very large carts can be
+        streamed to a file without building the whole text in memory.
+
+        Args:
+            out: File-like object to write to (defaults to sys.stdout)
+            page: 1-based page number (only used with page_size)
+            page_size: Lines per page, or None to print every line
+        """
+        write = (out if out is not None else sys.stdout).write
+        for chunk in self._render_chunks(page, page_size):
+            write(chunk)
 
     def __len__(self) -> int:
         """Return the number of unique items in the cart."""
-        return len(self.items)
+        return len(self._lines) - len(self._removed)
+
+    def __eq__(self, other: object) -> bool:
+        """Carts are equal when they hold equal lines in the same order."""
+        if not isinstance(other, ShoppingCart):
+            return NotImplemented
+        return self.items == other.items
+
+    def __repr__(self) -> str:
+        """Debug representation listing the cart lines."""
+        return f"ShoppingCart(items={self.items!r})"
 
     def __str__(self) -> str:
         """String representation of the shopping cart."""
-        return f"ShoppingCart(items={len(self.items)}, total=${self.get_total_payment():.2f})"
+        return f"ShoppingCart(items={len(self)}, total=${self.get_total_payment():.2f})"
+
+
+class CartTransaction:
+    """
+    Change set for ShoppingCart.apply_changes, used as a context manager.
+
+    Changes are only recorded until the with-block exits; they are then
+    applied all or nothing. If the block raises, nothing is applied.
+    """
+
+    def __init__(self, cart: ShoppingCart) -> None:
+        self.cart = cart
+        self.updates: dict[str, int] = {}
+        self.removals: list[str] = []
+
+    def update_quantity(self, item_name: str, new_quantity: int) -> None:
+        """Record a quantity update."""
+        self.updates[item_name] = new_quantity
+
+    def remove_from_cart(self, item_name: str) -> None:
+        """Record a removal."""
+        self.removals.append(item_name)
+
+    def commit(self) -> int:
+        """Apply the recorded changes and reset the change set."""
+        changed = self.cart.apply_changes(self.updates, self.removals)
+        self.updates = {}
+        self.removals = []
+        return changed
+
+    def __enter__(self) -> "CartTransaction":
+        return self
+
+    def __exit__(self, exc_type: Optional[type], *exc_info: object) -> None:
+        if exc_type is None:
+            self.commit()
 
 
 def main() -> None:
     """
     Demonstrate shopping cart functionality with comprehensive examples.
     """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    cart_events.start_flusher(interval=0.5)
+
     print("=" * 60)
     print("SHOPPING CART MANAGEMENT SYSTEM - DEMO")
     print("=" * 60)
@@ -362,6 +1188,8 @@ def main() -> None:
     print("DEMO COMPLETED")
     print("=" * 60)
 
+    cart_events.stop_flusher()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,349 @@
+"""
+Rule-based promotions for ShoppingCart.
+
+Rules are compiled once by PromotionEngine into a plan that maps each
+(case-folded) item name to the rules that read it. A PricedCart keeps the
+per-name line aggregates and the per-rule discounts of one cart; on reprice
+it asks the cart which names changed since its last look and only
+recomputes those and the rules that depend on them, plus the few cart-level
+rules, so repricing does not grow with the number of configured promotions.
+
+All money is in integer cents.
+"""
+
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable, Mapping, Optional, Protocol
+
+from practice import InvalidDiscountError, InvalidPriceError, ShoppingCart, from_cents
+
+
+@dataclass(frozen=True, slots=True)
+class LineTotals:
+    """All cart lines sharing one case-folded name, aggregated."""
+    quantity: int
+    subtotal_cents: int
+    min_price_cents: int
+
+
+class ItemRule(Protocol):
+    """
+    A promotion that depends only on the lines of some item names.
+
+    A rule must grant nothing while none of its names is in the cart.
+    """
+    label: str
+
+    def item_names(self) -> tuple[str, ...]:
+        """Case-folded names whose lines the rule reads."""
+        ...
+
+    def discount_cents(self, lines: Mapping[str, LineTotals]) -> int:
+        """Discount granted for the given per-name aggregates."""
+        ...
+
+
+def _percent_of(cents: int, percent: Decimal) -> int:
+    """Return percent% of an amount in cents, rounded half up."""
+    return int((cents * percent / 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _rule_label(rule: object, position: int) -> str:
+    """Name a rule by its label, falling back to its type and position."""
+    return getattr(rule, "label", "") or f"{type(rule).__name__}#{position}"
+
+
+def _to_percent(percent: Decimal) -> Decimal:
+    """Accept an int, float or Decimal percentage and return it as a checked Decimal."""
+    percent = Decimal(str(percent))
+    if not 0 <= percent <= 100:
+        raise InvalidDiscountError(f"Discount must be between 0% and 100%, got {percent}%")
+    return percent
+
+
+@dataclass(frozen=True)
+class PercentOffItem:
+    """Percentage off every unit of one item."""
+    item_name: str
+    percent: Decimal
+    label: str = ""
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "percent", _to_percent(self.percent))
+
+    def item_names(self) -> tuple[str, ...]:
+        return (self.item_name.casefold(),)
+
+    def discount_cents(self, lines: Mapping[str, LineTotals]) -> int:
+        line = lines.get(self.item_name.casefold())
+        return _percent_of(line.subtotal_cents, self.percent) if line else 0
+
+
+@dataclass(frozen=True)
+class BuyXGetY:
+    """Buy `buy` units of an item and get `free` more units for free."""
+    item_name: str
+    buy: int
+    free: int
+    label: str = ""
+
+    def __post_init__(self) -> None:
+        if self.buy < 1 or self.free < 1:
+            raise ValueError(f"Buy and free counts must be at least 1, got {self.buy}/{self.free}")
+
+    def item_names(self) -> tuple[str, ...]:
+        return (self.item_name.casefold(),)
+
+    def discount_cents(self, lines: Mapping[str, LineTotals]) -> int:
+        line = lines.get(self.item_name.casefold())
+        if not line:
+            return 0
+        free_units = line.quantity // (self.buy + self.free) * self.free
+        return free_units * line.min_price_cents
+
+
+@dataclass(frozen=True)
+class Bundle:
+    """A fixed price for one unit each of several items."""
+    bundle_items: tuple[str, ...]
+    bundle_price_cents: int
+    label: str = ""
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "bundle_items", tuple(self.bundle_items))
+        if not self.bundle_items:
+            raise ValueError("A bundle needs at least one item")
+        if self.bundle_price_cents < 0:
+            raise InvalidPriceError(f"Bundle price must not be negative, got {self.bundle_price_cents} cents")
+
+    def item_names(self) -> tuple[str, ...]:
+        return tuple(name.casefold() for name in self.bundle_items)
+
+    def discount_cents(self, lines: Mapping[str, LineTotals]) -> int:
+        components = [lines.get(name) for name in self.item_names()]
+        if not all(components):
+            return 0
+        bundles = min(line.quantity for line in components)
+        saving = sum(line.min_price_cents for line in components) - self.bundle_price_cents
+        return bundles * saving if saving > 0 else 0
+
+
+@dataclass(frozen=True)
+class TieredPercentOff:
+    """
+    Cart-level percentage off, by spend tier.
+
+    Tiers are (threshold in cents, percent) pairs; the highest threshold the
+    cart reaches after item discounts wins.
+    """
+    tiers: tuple[tuple[int, Decimal], ...]
+    label: str = ""
+
+    def __post_init__(self) -> None:
+        tiers = ((threshold, _to_percent(percent)) for threshold, percent in self.tiers)
+        object.__setattr__(self, "tiers", tuple(sorted(tiers)))
+
+    def discount_cents(self, total_cents: int) -> int:
+        percent = Decimal(0)
+        for threshold, tier_percent in self.tiers:
+            if total_cents < threshold:
+                break
+            percent = tier_percent
+        return _percent_of(total_cents, percent)
+
+
+@dataclass
+class PriceQuote:
+    """The priced state of a cart."""
+    subtotal_cents: int
+    discount_cents: int
+    applied: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_cents(self) -> int:
+        return self.subtotal_cents - self.discount_cents
+
+    @property
+    def total(self) -> float:
+        return from_cents(self.total_cents)
+
+
+class PromotionEngine:
+    """
+    Compiled set of promotion rules.
+
+    Attributes:
+        item_rules: Rules that depend on specific item names
+        cart_rules: Rules that depend on the discounted cart total
+    """
+
+    def __init__(self, item_rules: Iterable[ItemRule] = (),
+                 cart_rules: Iterable[TieredPercentOff] = ()) -> None:
+        self.item_rules = list(item_rules)
+        self.cart_rules = list(cart_rules)
+        self._rules_by_name: dict[str, list[int]] = {}
+        for rule_id, rule in enumerate(self.item_rules):
+            for name in rule.item_names():
+                self._rules_by_name.setdefault(name, []).append(rule_id)
+
+    def rules_for(self, names: Iterable[str]) -> set[int]:
+        """
+        Look up the item rules affected by a set of case-folded names.
+
+        Returns:
+            Rule ids (indexes into item_rules)
+        """
+        affected: set[int] = set()
+        for name in names:
+            affected.update(self._rules_by_name.get(name, ()))
+        return affected
+
+    def is_relevant(self, name: str) -> bool:
+        """Check whether any item rule reads the given case-folded name."""
+        return name in self._rules_by_name
+
+
+class PricedCart:
+    """
+    A cart plus its cached promotion state.
+
+    Call reprice() after changing the cart to bring the quote up to date.
+    The names to recompute come from the cart's change log; if the log no
+    longer covers everything since the last reprice (or the whole cart
+    changed), every name is re-evaluated.
+    """
+
+    def __init__(self, engine: PromotionEngine, cart: ShoppingCart) -> None:
+        self.engine = engine
+        self.cart = cart
+        self._lines: dict[str, LineTotals] = {}
+        self._rule_discounts: dict[int, int] = {}
+        self._item_discount_cents = 0
+        self._version = -1
+        self.reprice()
+
+    def _aggregate(self, name: str) -> Optional[LineTotals]:
+        """Aggregate the cart lines for one case-folded name."""
+        group = self.cart.find_all(name)
+        if not group:
+            return None
+        return LineTotals(
+            quantity=sum(item.item_quantity for item in group),
+            subtotal_cents=sum(item.get_subtotal_cents() for item in group),
+            min_price_cents=min(item.price_cents for item in group),
+        )
+
+    def reprice(self) -> PriceQuote:
+        """
+        Bring the cached discounts up to date and return the quote.
+
+        Returns:
+            The current price quote
+        """
+        engine = self.engine
+        changed_names = self.cart.changed_since(self._version)
+        self._version = self.cart.version
+        if changed_names is None:
+            # Only names in the cart can earn a discount, so walk the cart's
+            # names rather than every configured rule. Rules discounting
+            # before are re-evaluated too, in case their lines are gone.
+            present = [name for name in self.cart.names() if engine.is_relevant(name)]
+            self._lines = {}
+            for name in present:
+                line = self._aggregate(name)
+                if line is not None:
+                    self._lines[name] = line
+            affected = engine.rules_for(present) | self._rule_discounts.keys()
+        else:
+            folded = {name for name in changed_names if engine.is_relevant(name)}
+            for name in folded:
+                line = self._aggregate(name)
+                if line is None:
+                    self._lines.pop(name, None)
+                else:
+                    self._lines[name] = line
+            affected = engine.rules_for(folded)
+
+        for rule_id in affected:
+            new = engine.item_rules[rule_id].discount_cents(self._lines)
+            old = self._rule_discounts.get(rule_id, 0)
+            if new != old:
+                self._item_discount_cents += new - old
+                if new:
+                    self._rule_discounts[rule_id] = new
+                else:
+                    del self._rule_discounts[rule_id]
+        return self.quote()
+
+    def quote(self) -> PriceQuote:
+        """
+        Price the cart from the cached item discounts.
+
+        Cart-level rules are evaluated here on the running total, which is
+        O(1) per rule.
+
+        Returns:
+            The current price quote
+        """
+        engine = self.engine
+        subtotal = self.cart.get_total_cents()
+        item_discount = min(self._item_discount_cents, subtotal)
+        applied = {
+            _rule_label(engine.item_rules[rule_id], rule_id): cents
+            for rule_id, cents in self._rule_discounts.items()
+        }
+        cart_discount = 0
+        for position, rule in enumerate(engine.cart_rules):
+            cents = rule.discount_cents(subtotal - item_discount - cart_discount)
+            if cents:
+                applied[_rule_label(rule, position)] = cents
+                cart_discount += cents
+        return PriceQuote(subtotal, item_discount + cart_discount, applied)
+
+
+def main() -> None:
+    """
+    Price a cart under a few promotions, repricing incrementally.
+    """
+    import logging
+    import time
+
+    logging.disable(logging.INFO)
+    engine = PromotionEngine(
+        item_rules=[
+            PercentOffItem("Keyboard", Decimal(15), label="15% off keyboards"),
+            BuyXGetY("Mouse", buy=2, free=1, label="Mice: buy 2 get 1"),
+            Bundle(("Laptop", "Laptop Bag"), bundle_price_cents=99_900, label="Laptop + bag"),
+        ] + [PercentOffItem(f"Catalog-{i}", Decimal(5)) for i in range(10_000)],
+        cart_rules=[TieredPercentOff(((50_000, Decimal(2)), (100_000, Decimal(5))), label="Spend tiers")],
+    )
+
+    cart = ShoppingCart()
+    cart.add_to_cart("Laptop", 1, 999.99)
+    cart.add_to_cart("Laptop Bag", 1, 49.99)
+    cart.add_to_cart("Mouse", 3, 29.99)
+    cart.add_to_cart("Keyboard", 1, 79.99)
+    priced = PricedCart(engine, cart)
+    print(f"Initial: {priced.quote()}")
+
+    cart.update_quantity("Mouse", 6)
+    quote = priced.reprice()
+    print(f"6 mice:  {quote}")
+    print(f"Total: ${quote.total:.2f}")
+
+    start = time.perf_counter()
+    for quantity in range(1, 10_001):
+        cart.update_quantity("Keyboard", quantity)
+        priced.reprice()
+    elapsed = time.perf_counter() - start
+    print(f"10k incremental reprices with {len(engine.item_rules):,} rules: {elapsed * 1000:.1f} ms")
+
+    # Changes made without telling the priced cart are picked up too
+    cart.remove_from_cart("Laptop Bag")
+    cart.clear_cart()
+    cart.add_to_cart("Mouse", 3, 29.99)
+    assert priced.reprice().applied == {"Mice: buy 2 get 1": 2999}
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Tuple
 
-@dataclass
+# Upper bound on distinct (name, price) keys held by dedupe_stream at once
+STREAM_DEDUP_MAX_KEYS = 100_000
+
+# Frozen so a line cannot change behind the cart's back; build a new one instead
+@dataclass(frozen=True)
 class CartItem:
     item_name: str
     item_price: float
@@ -13,37 +17,131 @@ class CartItem:
 @dataclass
 class Cart:
     items: List[CartItem] = field(default_factory=list)
+    # (name, price) -> position in items; keeps the cart deduplicated as items are added
+    _positions: Dict[Tuple[str, float], int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # Set by invalidate(): `items` was edited directly, so _positions must be rebuilt
+    _positions_stale: bool = field(default=False, init=False, repr=False, compare=False)
+    # Bumped on every change to the contents; cached totals are tagged with it
+    version: int = field(default=0, init=False, repr=False, compare=False)
+    _cached_version: int = field(default=-1, init=False, repr=False, compare=False)
+    # The lines the cached totals were computed from
+    _cached_items: List[CartItem] = field(default_factory=list, init=False, repr=False, compare=False)
+    _subtotals: List[float] = field(default_factory=list, init=False, repr=False, compare=False)
+    _total: float = field(default=0.0, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.clear_duplicated_items()
     
     def add_item(self, item_name: str, item_price: float, item_quantity: int) -> None:
-        cart_item = CartItem(item_name, item_price, item_quantity)
-        self.items.append(cart_item)
+        key = (item_name, item_price)  # Unique key based on name and price
+        position = self._positions.get(key)
+        if self._positions_stale or (
+            position is None and len(self._positions) != len(self.items)
+        ) or (position is not None and not self._holds(position, key)):
+            # `items` was edited directly; re-derive the index before trusting it
+            self.clear_duplicated_items()
+            position = self._positions.get(key)
+        if position is None:
+            self._positions[key] = len(self.items)
+            self.items.append(CartItem(item_name, item_price, item_quantity))
+        else:
+            # Replace the line instead of mutating it, so other references stay valid
+            existing = self.items[position]
+            self.items[position] = CartItem(item_name, item_price, existing.item_quantity + item_quantity)
+        self.version += 1
     
+    def _holds(self, position: int, key: Tuple[str, float]) -> bool:
+        # True if the line at `position` is the one `key` is indexed under
+        if position >= len(self.items):
+            return False
+        item = self.items[position]
+        return (item.item_name, item.item_price) == key
+
     def clear_duplicated_items(self) -> None:
-        # Create a dictionary to store unique items
-        unique_items = {}
+        # add_item keeps the cart deduplicated, so there is only work to do
+        # if `items` was modified directly; checking the index is cheaper than a rebuild
+        if (not self._positions_stale and len(self._positions) == len(self.items)
+                and all(self._holds(position, key) for key, position in self._positions.items())):
+            return
+        unique_items: Dict[Tuple[str, float], CartItem] = {}
         for item in self.items:
-            key = (item.item_name, item.item_price)  # Unique key based on name and price
+            key = (item.item_name, item.item_price)
             if key in unique_items:
-                # If item exists, add quantities
-                unique_items[key].item_quantity += item.item_quantity
+                # Build a new merged item; never mutate the ones already in the list
+                merged = unique_items[key]
+                unique_items[key] = CartItem(item.item_name, item.item_price,
+                                             merged.item_quantity + item.item_quantity)
             else:
                 unique_items[key] = item
-        # Update items list with unique items
         self.items = list(unique_items.values())
+        self._positions = {key: position for position, key in enumerate(unique_items)}
+        self._positions_stale = False
+        self.version += 1
+
+    def invalidate(self) -> None:
+        # Call after editing `items` directly, so the dedup index is rebuilt
+        # and the version moves on right away
+        self._positions_stale = True
+        self.version += 1
+
+    def is_current(self, version: int) -> bool:
+        # True if nothing changed since `version` was read, so values derived then are still valid
+        return version == self.version
+
+    def _refresh(self) -> None:
+        # `items` may have been edited directly without bumping the version.
+        # Items are frozen, so comparing the lines (by identity first) is
+        # enough to notice, and much cheaper than recomputing the totals.
+        if self._cached_items != self.items:
+            self.version += 1
+        if self._cached_version != self.version:
+            self._subtotals = [item.get_subtotal() for item in self.items]
+            self._total = sum(self._subtotals)
+            self._cached_items = list(self.items)
+            self._cached_version = self.version
+
+    def get_subtotals(self) -> List[float]:
+        self._refresh()
+        return list(self._subtotals)
     
     def get_total(self) -> float:
-        return sum(item.get_subtotal() for item in self.items)
+        self._refresh()
+        return self._total
     
     def print_cart(self) -> None:
+        self._refresh()
         print("Shopping Cart Contents:")
         print("-" * 50)
-        for item in self.items:
+        for item, subtotal in zip(self.items, self._subtotals):
             print(f"Item: {item.item_name}")
             print(f"Price: ${item.item_price:.2f}")
             print(f"Quantity: {item.item_quantity}")
-            print(f"Subtotal: ${item.get_subtotal():.2f}")
+            print(f"Subtotal: ${subtotal:.2f}")
             print("-" * 50)
-        print(f"Total: ${self.get_total():.2f}")
+        print(f"Total: ${self._total:.2f}")
+
+def dedupe_stream(items: Iterable[CartItem],
+                  max_keys: int = STREAM_DEDUP_MAX_KEYS) -> Iterator[CartItem]:
+    """Merge duplicate (name, price) lines from a possibly unbounded stream.
+
+    At most `max_keys` distinct lines are held at once. When that limit is
+    reached the merged lines are emitted and folding starts over, so a key
+    that reappears after a flush yields a second line. Input grouped or
+    sorted by (name, price), or with fewer distinct keys than `max_keys`,
+    comes out fully deduplicated. Input items are never mutated.
+    """
+    if max_keys < 1:
+        raise ValueError(f"max_keys must be at least 1, got {max_keys}")
+    quantities: Dict[Tuple[str, float], int] = {}
+    for item in items:
+        key = (item.item_name, item.item_price)
+        if key not in quantities and len(quantities) >= max_keys:
+            yield from (CartItem(name, price, quantity) for (name, price), quantity in quantities.items())
+            quantities.clear()
+        quantities[key] = quantities.get(key, 0) + item.item_quantity
+    yield from (CartItem(name, price, quantity) for (name, price), quantity in quantities.items())
 
 def main():
     # Create a new cart
@@ -54,13 +152,14 @@ def main():
     cart.add_item("Pen", 4.99, 3)
     cart.add_item("Book", 29.99, 1)  # Duplicate item
     
-    print("Before removing duplicates:")
+    print("Duplicates are merged as they are added:")
     cart.print_cart()
     
-    cart.clear_duplicated_items()
-    
-    print("\nAfter removing duplicates:")
-    cart.print_cart()
+    # Stream a large import through bounded-memory deduplication
+    imported = (CartItem("Book" if i % 2 else "Pen", 29.99 if i % 2 else 4.99, 1) for i in range(10_000))
+    print("\nDeduplicated import stream:")
+    for item in dedupe_stream(imported):
+        print(f"{item.item_name}: {item.item_quantity} @ ${item.item_price:.2f}")
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,16 @@
-from dataclasses import dataclass, field
-from datetime import datetime
-from typing import List, Optional
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 from enum import IntEnum
+import heapq
+import os
+import sys
+
+# The due-date index is shared with documentation/order_store.py
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "documentation"))
+from date_index import DateIndex, epoch_micros  # noqa: E402,F401 (epoch_micros is re-exported)
 
 
 class Priority(IntEnum):
@@ -11,32 +20,258 @@ class Priority(IntEnum):
     LOW = 2
 
 
-@dataclass
+# Frozen: TodoList indexes tasks by these fields, so they only change
+# through the list (complete_task).
+@dataclass(frozen=True)
 class Task:
     name: str
     due_date: datetime
     priority: Priority
     completed: bool = False
 
+    # complete_task flips `completed` in place, so tasks stay unhashable
+    __hash__ = None  # type: ignore[assignment]
+
     def __str__(self) -> str:
         status = "✅" if self.completed else "⏳"
         return f"{status} {self.name} (Due: {self.due_date.strftime('%Y-%m-%d %H:%M')})"
 
 
-@dataclass
+PRIORITY_TEXT = {
+    Priority.HIGH: "🔴 High",
+    Priority.MEDIUM: "🟡 Medium",
+    Priority.LOW: "🟢 Low"
+}
+
+# Tasks formatted per buffered write when rendering a TodoList
+RENDER_CHUNK_TASKS = 1000
+# Dead heap entries tolerated before TaskQueue rebuilds its heap
+TASK_QUEUE_MIN_DEAD = 64
+# Entries per block of DueDateIndex before the block is split
+DUE_INDEX_BLOCK_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class TaskSummary:
+    """Task counts of a TodoList; overdue is as of a given time."""
+    total: int
+    pending: int
+    completed: int
+    overdue: int
+
+
+# An index maps a name to its Task, or to a list of them only when the name repeats.
+TaskIndex = Dict[str, Union[Task, List[Task]]]
+
+
+def _index_add(index: TaskIndex, key: str, task: Task) -> None:
+    entry = index.get(key)
+    if entry is None:
+        index[key] = task
+    elif isinstance(entry, list):
+        entry.append(task)
+    else:
+        index[key] = [entry, task]
+
+
+def _index_remove(index: TaskIndex, key: str, task: Task) -> None:
+    entry = index[key]
+    if isinstance(entry, list):
+        for position, other in enumerate(entry):
+            if other is task:
+                del entry[position]
+                break
+        if len(entry) == 1:
+            index[key] = entry[0]
+    else:
+        del index[key]
+
+
+def _build_index(keys: List[str], tasks: List[Task]) -> TaskIndex:
+    """Index tasks under their keys in one go; stays in C unless a key repeats."""
+    index: TaskIndex = dict(zip(keys, tasks))
+    if len(index) < len(tasks):
+        index = {}
+        for key, task in zip(keys, tasks):
+            _index_add(index, key, task)
+    return index
+
+
+def _index_first(index: TaskIndex, key: str) -> Optional[Task]:
+    entry = index.get(key)
+    if isinstance(entry, list):
+        return entry[0]
+    return entry
+
+
+class TaskQueue:
+    """Pending tasks ordered by (priority, due_date), as a binary heap.
+
+    Ties keep insertion order. Removal marks the task's heap entry as dead
+    instead of searching the heap for it; dead entries are dropped when they
+    reach the top, and the heap is rebuilt once they outnumber live ones. The
+    top entry is always live, so peek() is O(1); push, pop and discard are
+    O(log n) amortized. A task's priority and due date must not change while
+    it is queued.
+    """
+
+    def __init__(self, tasks: Iterable[Task] = ()) -> None:
+        tasks = list(tasks)
+        self._counter = len(tasks)
+        # [priority, due_date, insertion number, task or None once discarded]
+        self._heap: List[list] = [[task.priority, task.due_date, counter, task]
+                                  for counter, task in enumerate(tasks)]
+        self._entries: Dict[int, list] = dict(zip(map(id, tasks), self._heap))
+        heapq.heapify(self._heap)
+
+    def push(self, task: Task) -> None:
+        entry = [task.priority, task.due_date, self._counter, task]
+        self._counter += 1
+        self._entries[id(task)] = entry
+        heapq.heappush(self._heap, entry)
+
+    def discard(self, task: Task) -> bool:
+        """Remove a task from the queue; False if it was not queued."""
+        entry = self._entries.pop(id(task), None)
+        if entry is None:
+            return False
+        entry[3] = None
+        if len(self._heap) > 2 * len(self._entries) + TASK_QUEUE_MIN_DEAD:
+            self._heap = [entry for entry in self._heap if entry[3] is not None]
+            heapq.heapify(self._heap)
+        self._drop_dead()
+        return True
+
+    def _drop_dead(self) -> None:
+        heap = self._heap
+        while heap and heap[0][3] is None:
+            heapq.heappop(heap)
+
+    def peek(self) -> Optional[Task]:
+        """Return the next task without removing it, or None if the queue is empty."""
+        return self._heap[0][3] if self._heap else None
+
+    def pop(self) -> Optional[Task]:
+        """Remove and return the next task, or None if the queue is empty."""
+        if not self._heap:
+            return None
+        task = heapq.heappop(self._heap)[3]
+        del self._entries[id(task)]
+        self._drop_dead()
+        return task
+
+    def __iter__(self) -> Iterator[Task]:
+        """Yield the queued tasks in order, popping a copy of the heap as it goes."""
+        heap = list(self._heap)
+        while heap:
+            task = heapq.heappop(heap)[3]
+            if task is not None:
+                yield task
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, task: object) -> bool:
+        return id(task) in self._entries
+
+
+class DueDateIndex:
+    """Pending tasks sorted by due date, for range queries.
+
+    A thin layer over date_index.DateIndex, the blocked sorted array shared
+    with documentation/order_store.py: add and discard cost
+    O(log n + block size), range queries O(log n + k).
+    """
+
+    def __init__(self, tasks: Iterable[Task] = ()) -> None:
+        self._index: DateIndex[Task] = DateIndex(attrgetter("due_date"), DUE_INDEX_BLOCK_SIZE)
+        self._index.add_many(tasks)
+
+    def add(self, task: Task) -> None:
+        self._index.add(task)
+
+    def discard(self, task: Task) -> bool:
+        """Remove a task from the index; False if it was not indexed."""
+        return self._index.discard(task)
+
+    def between(self, start: Optional[datetime], end: Optional[datetime]) -> Iterator[Task]:
+        """Yield the tasks due in [start, end), earliest first; None leaves a side open."""
+        return self._index.between(start, end)
+
+    def count_before(self, end: datetime) -> int:
+        """Count the tasks due before end in O(log n + n / block size)."""
+        return self._index.count_between(None, end)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
 class TodoList:
-    """A collection of tasks with various management operations."""
-    items: List[Task] = field(default_factory=list)
+    """A collection of tasks with various management operations.
+
+    Tasks are kept in an insertion-ordered dict keyed by task identity, with an
+    exact and a case-folded name index on top, so finding, completing and
+    removing tasks by name is O(1). Pending tasks are also queued by
+    (priority, due_date), so the next task to work on is always at hand, and
+    indexed by due date, so overdue and upcoming tasks are found without a
+    scan. Tasks are frozen so that none of this can go stale: complete them
+    with complete_task, which also takes them out of the queue and the index.
+
+    Attributes:
+        items: Snapshot tuple of the tasks, in list order
+        verbose: Whether operations print a confirmation line
+    """
+
+    def __init__(self, items: Optional[Iterable[Task]] = None, verbose: bool = True) -> None:
+        self.verbose = verbose
+        self._rebuild(items or ())
+
+    def _rebuild(self, tasks: Iterable[Task]) -> None:
+        """Replace the contents with the given tasks, in order, building every index in bulk."""
+        tasks = list(tasks)
+        self._tasks: Dict[int, Task] = dict(zip(map(id, tasks), tasks))
+        names = [task.name for task in tasks]
+        self._by_name = _build_index(names, tasks)
+        self._by_folded_name = _build_index([name.casefold() for name in names], tasks)
+        pending = [task for task in tasks if not task.completed]
+        self._queue = TaskQueue(pending)
+        self._due = DueDateIndex(pending)
+
+    def _index(self, task: Task) -> None:
+        self._tasks[id(task)] = task
+        _index_add(self._by_name, task.name, task)
+        _index_add(self._by_folded_name, task.name.casefold(), task)
+
+    def _insert(self, task: Task) -> None:
+        self._index(task)
+        if not task.completed:
+            self._queue.push(task)
+            self._due.add(task)
+
+    def _discard(self, task: Task) -> None:
+        del self._tasks[id(task)]
+        _index_remove(self._by_name, task.name, task)
+        _index_remove(self._by_folded_name, task.name.casefold(), task)
+        if self._queue.discard(task):
+            self._due.discard(task)
+
+    def _say(self, message: str) -> None:
+        if self.verbose:
+            print(message)
+
+    @property
+    def items(self) -> Tuple[Task, ...]:
+        """Snapshot of the tasks in list order; read-only, assign to replace them all."""
+        return tuple(self._tasks.values())
+
+    @items.setter
+    def items(self, tasks: Iterable[Task]) -> None:
+        self._rebuild(tasks)
 
     @staticmethod
     def _get_priority_text(priority: Priority) -> str:
         """Convert numeric priority to a descriptive text."""
-        priority_map = {
-            Priority.HIGH: "🔴 High",
-            Priority.MEDIUM: "🟡 Medium",
-            Priority.LOW: "🟢 Low"
-        }
-        return priority_map.get(priority, f"Priority {priority}")
+        return PRIORITY_TEXT.get(priority, f"Priority {priority}")
 
     def add_task(self, name: str, due_date: datetime, priority: Priority) -> None:
         """Add a new task to the list."""
@@ -44,108 +279,185 @@ class TodoList:
             raise ValueError("Task name cannot be empty")
         
         task = Task(name.strip(), due_date, priority)
-        self.items.append(task)
-        print(f"✅ Added task: {name}")
+        self._insert(task)
+        self._say(f"✅ Added task: {name}")
 
     def remove_task(self, name: str) -> bool:
-        """Remove a task by name. Returns True if task was found and removed."""
-        original_count = len(self.items)
-        self.items = [task for task in self.items if task.name != name.strip()]
-        
-        if len(self.items) < original_count:
-            print(f"🗑️ Removed task: {name}")
-            return True
-        else:
-            print(f"❌ Task not found: {name}")
+        """Remove every task with this exact name. Returns True if any was found and removed."""
+        entry = self._by_name.get(name.strip())
+        if entry is None:
+            self._say(f"❌ Task not found: {name}")
             return False
 
+        for task in list(entry) if isinstance(entry, list) else [entry]:
+            self._discard(task)
+        self._say(f"🗑️ Removed task: {name}")
+        return True
+
     def complete_task(self, name: str) -> bool:
-        """Mark a task as completed. Returns True if task was found."""
-        for task in self.items:
-            if task.name == name.strip():
-                task.completed = True
-                print(f"🎉 Completed task: {name}")
-                return True
-        
-        print(f"❌ Task not found: {name}")
-        return False
+        """Mark the first task with this exact name as completed. Returns True if task was found."""
+        task = _index_first(self._by_name, name.strip())
+        if task is None:
+            self._say(f"❌ Task not found: {name}")
+            return False
+
+        if not task.completed:
+            object.__setattr__(task, "completed", True)  # frozen to everyone but its list
+            self._queue.discard(task)
+            self._due.discard(task)
+        self._say(f"🎉 Completed task: {name}")
+        return True
+
+    def find_task(self, name: str, exact: bool = False) -> Optional[Task]:
+        """Find the first task with this name, case-insensitively unless exact is set."""
+        if exact:
+            return _index_first(self._by_name, name.strip())
+        return _index_first(self._by_folded_name, name.strip().casefold())
+
+    def peek_next_task(self) -> Optional[Task]:
+        """Return the pending task with the highest priority and earliest due date, in O(1)."""
+        return self._queue.peek()
+
+    def pop_next_task(self) -> Optional[Task]:
+        """Remove the next pending task (see peek_next_task) from the list and return it."""
+        task = self._queue.peek()
+        if task is not None:
+            self._discard(task)
+        return task
 
-    def find_task(self, name: str) -> Optional[Task]:
-        """Find a task by name."""
-        for task in self.items:
-            if task.name.lower() == name.strip().lower():
-                return task
-        return None
+    def iter_pending_by_priority(self) -> Iterator[Task]:
+        """Yield pending tasks by priority, then due date, without sorting the whole list."""
+        return iter(self._queue)
 
     def sort_tasks(self, by_priority: bool = True, by_due_date: bool = False) -> None:
-        """Sort tasks by priority and/or due date."""
+        """Sort tasks by priority and/or due date.
+
+        This reorders the whole list; to find the next task, use
+        peek_next_task instead.
+        """
         if by_priority and by_due_date:
-            self.items.sort(key=lambda task: (task.priority, task.due_date))
-            print("📋 Sorted tasks by priority and due date")
+            self.items = sorted(self._tasks.values(), key=lambda task: (task.priority, task.due_date))
+            self._say("📋 Sorted tasks by priority and due date")
         elif by_priority:
-            self.items.sort(key=lambda task: task.priority)
-            print("📋 Sorted tasks by priority")
+            self.items = sorted(self._tasks.values(), key=lambda task: task.priority)
+            self._say("📋 Sorted tasks by priority")
         elif by_due_date:
-            self.items.sort(key=lambda task: task.due_date)
-            print("📋 Sorted tasks by due date")
+            self.items = sorted(self._tasks.values(), key=lambda task: task.due_date)
+            self._say("📋 Sorted tasks by due date")
 
     def get_pending_tasks(self) -> List[Task]:
         """Get all incomplete tasks."""
-        return [task for task in self.items if not task.completed]
+        return [task for task in self._tasks.values() if not task.completed]
 
     def get_completed_tasks(self) -> List[Task]:
         """Get all completed tasks."""
-        return [task for task in self.items if task.completed]
+        return [task for task in self._tasks.values() if task.completed]
 
-    def get_overdue_tasks(self) -> List[Task]:
-        """Get all overdue incomplete tasks."""
-        now = datetime.now()
-        return [task for task in self.items 
-                if not task.completed and task.due_date < now]
+    def get_overdue_tasks(self, now: Optional[datetime] = None) -> List[Task]:
+        """Get all incomplete tasks due before now (default: the current time), earliest first."""
+        if now is None:
+            now = datetime.now()
+        return list(self._due.between(None, now))
 
-    def list_all_tasks(self, show_completed: bool = True) -> None:
-        """Display all tasks in a formatted list."""
-        tasks_to_show = self.items if show_completed else self.get_pending_tasks()
-        
-        if not tasks_to_show:
+    def get_tasks_due_within(self, hours: float, now: Optional[datetime] = None) -> List[Task]:
+        """Get incomplete tasks due from now (default: the current time) to `hours` later, earliest first."""
+        if now is None:
+            now = datetime.now()
+        return list(self._due.between(now, now + timedelta(hours=hours)))
+
+    def summary(self, now: Optional[datetime] = None) -> TaskSummary:
+        """Count tasks by state without visiting them; overdue is as of now (default: the current time)."""
+        if now is None:
+            now = datetime.now()
+        pending = len(self._queue)
+        return TaskSummary(len(self._tasks), pending, len(self._tasks) - pending,
+                           self._due.count_before(now))
+
+    def _render_chunks(self, show_completed: bool = True, now: Optional[datetime] = None,
+                       page: int = 1, page_size: Optional[int] = None) -> Iterator[str]:
+        """Render the task list as text chunks of up to RENDER_CHUNK_TASKS tasks.
+
+        Only the requested page is formatted, and the summary comes from the
+        counters, so the cost does not grow with the size of the list.
+        """
+        if now is None:
+            now = datetime.now()
+        counts = self.summary(now)
+        task_count = counts.total if show_completed else counts.pending
+        if task_count == 0:
             message = "No tasks found." if show_completed else "No pending tasks found."
-            print(f"📝 {message}")
+            yield f"📝 {message}\n"
             return
 
-        print("\n" + "=" * 70)
-        print(f"{'TASK LIST':^70}")
-        print("=" * 70)
+        if page < 1:
+            raise ValueError(f"Page must be at least 1, got {page}")
+        if page_size is not None and page_size < 1:
+            raise ValueError(f"Page size must be at least 1, got {page_size}")
+        if page_size is None:
+            start, stop = 0, task_count
+        else:
+            start = min((page - 1) * page_size, task_count)
+            stop = min(start + page_size, task_count)
 
-        for i, task in enumerate(tasks_to_show, 1):
-            priority_text = self._get_priority_text(task.priority)
-            due_date_str = task.due_date.strftime("%Y-%m-%d %H:%M")
+        yield f"\n{'=' * 70}\n{'TASK LIST':^70}\n{'=' * 70}\n"
+
+        tasks: Iterable[Task] = self._tasks.values()
+        if not show_completed:
+            tasks = (task for task in tasks if not task.completed)
+        chunk = []
+        for i, task in enumerate(islice(tasks, start, stop), start + 1):
             status_icon = "✅" if task.completed else "⏳"
-            
-            # Highlight overdue tasks
-            is_overdue = not task.completed and task.due_date < datetime.now()
-            overdue_marker = " ⚠️ OVERDUE" if is_overdue else ""
-
-            print(f"{i:2d}. {status_icon} {task.name}{overdue_marker}")
-            print(f"    📅 Due: {due_date_str}")
-            print(f"    🔥 Priority: {priority_text}")
-            print("-" * 50)
-
-        completed_count = len(self.get_completed_tasks())
-        pending_count = len(self.get_pending_tasks())
-        overdue_count = len(self.get_overdue_tasks())
-        
-        print(f"\n📊 Summary:")
-        print(f"   Total: {len(self.items)} | Pending: {pending_count} | "
-              f"Completed: {completed_count} | Overdue: {overdue_count}")
+            overdue_marker = " ⚠️ OVERDUE" if not task.completed and task.due_date < now else ""
+            chunk.append(
+                f"{i:2d}. {status_icon} {task.name}{overdue_marker}\n"
+                f"    📅 Due: {task.due_date.strftime('%Y-%m-%d %H:%M')}\n"
+                f"    🔥 Priority: {self._get_priority_text(task.priority)}\n"
+                f"{'-' * 50}\n"
+            )
+            if len(chunk) == RENDER_CHUNK_TASKS:
+                yield "".join(chunk)
+                chunk.clear()
+        if chunk:
+            yield "".join(chunk)
+
+        footer = []
+        if page_size is not None:
+            pages = -(-task_count // page_size)
+            footer.append(f"Page {page}/{pages} (tasks {start + 1}-{stop} of {task_count})\n")
+        footer.append("\n📊 Summary:\n")
+        footer.append(f"   Total: {counts.total} | Pending: {counts.pending} | "
+                      f"Completed: {counts.completed} | Overdue: {counts.overdue}\n")
+        yield "".join(footer)
+
+    def render(self, show_completed: bool = True, now: Optional[datetime] = None,
+               page: int = 1, page_size: Optional[int] = None) -> str:
+        """Render the task list (see list_all_tasks) into a single string."""
+        return "".join(self._render_chunks(show_completed, now, page, page_size))
+
+    def list_all_tasks(self, show_completed: bool = True, now: Optional[datetime] = None,
+                       page: int = 1, page_size: Optional[int] = None,
+                       out: Optional[TextIO] = None) -> None:
+        """Display all tasks in a formatted list.
+
+        Args:
+            show_completed: Whether completed tasks are listed
+            now: Time tasks are marked overdue against (default: the current time)
+            page: 1-based page number (only used with page_size)
+            page_size: Tasks per page, or None to list every task
+            out: File-like object to write to (defaults to sys.stdout)
+        """
+        write = (out if out is not None else sys.stdout).write
+        for chunk in self._render_chunks(show_completed, now, page, page_size):
+            write(chunk)
 
     def clear_completed_tasks(self) -> int:
         """Remove all completed tasks. Returns number of tasks removed."""
-        initial_count = len(self.items)
-        self.items = [task for task in self.items if not task.completed]
-        removed_count = initial_count - len(self.items)
+        initial_count = len(self._tasks)
+        self.items = [task for task in self._tasks.values() if not task.completed]
+        removed_count = initial_count - len(self._tasks)
         
         if removed_count > 0:
-            print(f"🧹 Removed {removed_count} completed task(s)")
+            self._say(f"🧹 Removed {removed_count} completed task(s)")
         
         return removed_count
 
@@ -163,6 +475,19 @@ class TodoList:
             due_date = base_time + time_offset
             self.add_task(name, due_date, priority)
 
+    def __len__(self) -> int:
+        """Return the number of tasks."""
+        return len(self._tasks)
+
+    def __eq__(self, other: object) -> bool:
+        """Lists are equal when they hold equal tasks in the same order."""
+        if not isinstance(other, TodoList):
+            return NotImplemented
+        return self.items == other.items
+
+    def __repr__(self) -> str:
+        return f"TodoList(items={self.items!r})"
+
 
 def main():
     """Demo function showing TodoList usage."""
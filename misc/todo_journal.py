@@ -0,0 +1,627 @@
+"""
+Durable TodoList: an append-only journal plus periodic snapshots.
+
+Every change made through a PersistentTodoList is applied to an in-memory
+TodoList and appended as a record to the current journal file. Records are
+buffered and written with one fsync per commit interval (group commit), so
+a burst of changes costs one disk flush. With sync_writes, each change
+waits for the commit that covers it.
+
+Once a journal holds compact_every records, it is committed and closed and
+a new journal generation is started; that is all the request path pays for.
+The generation boundary is a frozen view of the list: a background thread
+rebuilds the state as of the boundary from the previous snapshot plus the
+closed journals, writes it as the new snapshot and deletes the journals it
+covers. Startup loads the newest snapshot through a memory map, builds the
+list from it in bulk and replays only the journals written after it.
+
+Directory layout:
+    tasks.snap          snapshot; header names the first journal to replay
+    journal-<N>.log     journal generation N
+
+Journal record (little endian): crc32 u32 of the op and payload, payload
+length u32, op u8, payload. A torn record at the end of the newest journal
+(a crash mid-write) is discarded on startup.
+
+Snapshot (little endian): magic b"TSNP", version u16, reserved u16,
+generation u64, task count u64, then per task: due date in epoch
+microseconds i64, priority u8, completed u8, name length u16, name (UTF-8).
+
+Due dates are stored as naive datetimes; aware ones come back as naive UTC.
+"""
+
+import gc
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+from todo import Priority, Task, TodoList, epoch_micros
+
+SNAPSHOT_NAME = "tasks.snap"
+MAGIC = b"TSNP"
+VERSION = 1
+DEFAULT_COMMIT_INTERVAL = 0.005
+DEFAULT_COMPACT_EVERY = 1_000_000
+
+OP_ADD = 1
+OP_COMPLETE = 2
+OP_REMOVE = 3
+OP_CLEAR_COMPLETED = 4
+OP_SORT = 5
+OP_POP_NEXT = 6
+
+_RECORD = struct.Struct("<IIB")
+_ADD = struct.Struct("<qB")
+_SORT = struct.Struct("<??")
+_SNAPSHOT_HEADER = struct.Struct("<4sHHQQ")
+_SNAPSHOT_TASK = struct.Struct("<qBBH")
+_JOURNAL_NAME = re.compile(r"journal-(\d+)\.log$")
+_EPOCH = datetime(1970, 1, 1)
+
+
+class JournalFormatError(Exception):
+    """Raised when a journal or snapshot file is corrupt."""
+    pass
+
+
+class JournalWriteError(Exception):
+    """Raised when journal records could not be made durable."""
+    pass
+
+
+def _journal_path(directory: str, generation: int) -> str:
+    return os.path.join(directory, f"journal-{generation}.log")
+
+
+def _journal_generations(directory: str) -> List[int]:
+    """List the journal generations present in a directory, oldest first."""
+    generations = []
+    for name in os.listdir(directory):
+        match = _JOURNAL_NAME.match(name)
+        if match:
+            generations.append(int(match.group(1)))
+    return sorted(generations)
+
+
+def _fsync_directory(directory: str) -> None:
+    """Make renames and deletions in a directory durable (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _encode(op: int, payload: bytes = b"") -> bytes:
+    body = bytes((op,)) + payload
+    return _RECORD.pack(zlib.crc32(body), len(payload), op) + payload
+
+
+def _from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(0, 0, micros)
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector while a list is loaded.
+
+    Loading allocates millions of tasks and index entries, none of which form
+    cycles, and every allocation burst would otherwise trigger full
+    collections that rescan all of them.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class TaskJournal:
+    """
+    One journal generation, written with group commit.
+
+    append() only buffers; a background thread writes the buffer and fsyncs
+    it every commit_interval seconds. wait() blocks until a record is on disk.
+
+    If a write or fsync fails, the unwritten records go back to the front of
+    the buffer, the file is cut back to its last committed size, and the
+    error is kept. Until a later commit succeeds (the committer keeps
+    retrying), append() and wait() raise JournalWriteError.
+
+    The directory is fsynced once the file is open, so a newly created
+    journal cannot lose its directory entry, and the records committed to
+    it, on power loss.
+    """
+
+    def __init__(self, path: str, commit_interval: float = DEFAULT_COMMIT_INTERVAL) -> None:
+        self.path = path
+        self.commit_interval = commit_interval
+        self.records = 0
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._size = os.fstat(self._fd).st_size
+        _fsync_directory(os.path.dirname(path) or os.curdir)
+        self._buffer = bytearray()
+        self._appended = 0
+        self._synced = 0
+        self._error: Optional[OSError] = None
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._committer = threading.Thread(target=self._run, name="todo-journal", daemon=True)
+        self._committer.start()
+
+    def _failure(self) -> JournalWriteError:
+        return JournalWriteError(f"Could not write {self.path}: {self._error}")
+
+    def append(self, record: bytes) -> int:
+        """
+        Buffer a record; returns its sequence number for wait().
+
+        Raises:
+            JournalWriteError: If the last commit failed; the record is still
+                buffered behind the unwritten ones, in order
+        """
+        with self._cond:
+            self._buffer += record
+            self._appended += 1
+            self.records += 1
+            if self._error is not None:
+                raise self._failure() from self._error
+            return self._appended
+
+    def wait(self, sequence: int) -> None:
+        """
+        Block until the record with this sequence number is durable.
+
+        Raises:
+            JournalWriteError: If a commit fails before the record is written
+        """
+        with self._cond:
+            while self._synced < sequence:
+                if self._error is not None:
+                    raise self._failure() from self._error
+                self._cond.wait()
+
+    def _write(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+        os.fsync(self._fd)
+
+    def commit(self) -> None:
+        """
+        Write and fsync everything buffered so far.
+
+        Raises:
+            JournalWriteError: If the write or fsync fails
+        """
+        with self._write_lock:
+            with self._cond:
+                data = bytes(self._buffer)
+                self._buffer.clear()
+                upto = self._appended
+            if data:
+                try:
+                    self._write(data)
+                except OSError as e:
+                    with self._cond:
+                        self._buffer[:0] = data
+                        self._error = e
+                        self._cond.notify_all()
+                    try:
+                        os.ftruncate(self._fd, self._size)  # drop a partial write
+                    except OSError:
+                        pass
+                    raise self._failure() from e
+                self._size += len(data)
+            with self._cond:
+                self._synced = upto
+                self._error = None
+                self._cond.notify_all()
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.commit_interval):
+            try:
+                self.commit()
+            except JournalWriteError:
+                pass  # kept for append() and wait(); retried next interval
+
+    def close(self) -> None:
+        """
+        Commit what is buffered, stop the committer and close the file.
+
+        Raises:
+            JournalWriteError: If the final commit fails
+        """
+        self._closed.set()
+        self._committer.join()
+        try:
+            self.commit()
+        finally:
+            os.close(self._fd)
+
+
+def replay_journal(path: str, todo: TodoList, is_last: bool) -> int:
+    """
+    Apply the records of one journal file to a TodoList.
+
+    A damaged record ends the replay. In the newest journal it is a write cut
+    short by a crash, and the file is truncated there; anywhere else the
+    journal is corrupt.
+
+    Returns:
+        Number of records applied
+
+    Raises:
+        JournalFormatError: If an older journal is damaged
+    """
+    with open(path, "rb") as fp:
+        data = fp.read()
+    offset = 0
+    applied = 0
+    while offset < len(data):
+        if offset + _RECORD.size > len(data):
+            break
+        checksum, length, op = _RECORD.unpack_from(data, offset)
+        start = offset + _RECORD.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(bytes((op,)) + payload) != checksum:
+            break
+        _apply(todo, op, payload)
+        offset = start + length
+        applied += 1
+
+    if offset < len(data):
+        if not is_last:
+            raise JournalFormatError(f"Damaged record at byte {offset} of {path}")
+        with open(path, "r+b") as fp:
+            fp.truncate(offset)
+            fp.flush()
+            os.fsync(fp.fileno())
+    return applied
+
+
+def _apply(todo: TodoList, op: int, payload: bytes) -> None:
+    if op == OP_ADD:
+        micros, priority = _ADD.unpack_from(payload)
+        todo.add_task(str(payload[_ADD.size:], "utf-8"), _from_micros(micros), Priority(priority))
+    elif op == OP_COMPLETE:
+        todo.complete_task(str(payload, "utf-8"))
+    elif op == OP_REMOVE:
+        todo.remove_task(str(payload, "utf-8"))
+    elif op == OP_CLEAR_COMPLETED:
+        todo.clear_completed_tasks()
+    elif op == OP_SORT:
+        todo.sort_tasks(*_SORT.unpack(payload))
+    elif op == OP_POP_NEXT:
+        todo.pop_next_task()
+    else:
+        raise JournalFormatError(f"Unknown journal op {op}")
+
+
+SnapshotRow = Tuple[str, datetime, int, bool]
+
+
+def snapshot_rows(todo: TodoList) -> List[SnapshotRow]:
+    """Capture the values of a list's tasks, in list order, for write_snapshot."""
+    return [(task.name, task.due_date, int(task.priority), task.completed) for task in todo.items]
+
+
+def write_snapshot(directory: str, generation: int, rows: List[SnapshotRow]) -> None:
+    """
+    Write a snapshot that covers every journal before `generation`.
+
+    The file is written next to its destination and renamed into place.
+    """
+    path = os.path.join(directory, SNAPSHOT_NAME)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as fp:
+        fp.write(_SNAPSHOT_HEADER.pack(MAGIC, VERSION, 0, generation, len(rows)))
+        chunk = bytearray()
+        for name, due_date, priority, completed in rows:
+            encoded = name.encode("utf-8")
+            chunk += _SNAPSHOT_TASK.pack(epoch_micros(due_date), priority, completed, len(encoded))
+            chunk += encoded
+            if len(chunk) >= 1 << 20:
+                fp.write(chunk)
+                chunk.clear()
+        fp.write(chunk)
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(temp_path, path)
+    _fsync_directory(directory)
+
+
+def load_snapshot(directory: str) -> Tuple[int, List[Task]]:
+    """
+    Read the snapshot through a memory map.
+
+    Returns:
+        (first journal generation to replay, tasks in list order); (0, [])
+        if there is no snapshot
+
+    Raises:
+        JournalFormatError: If the snapshot is corrupt
+    """
+    path = os.path.join(directory, SNAPSHOT_NAME)
+    if not os.path.exists(path) or os.path.getsize(path) < _SNAPSHOT_HEADER.size:
+        if os.path.exists(path):
+            raise JournalFormatError(f"{path} is too short to be a snapshot")
+        return 0, []
+
+    with open(path, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        magic, version, _, generation, count = _SNAPSHOT_HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise JournalFormatError(f"{path} is not a task snapshot")
+        if version != VERSION:
+            raise JournalFormatError(f"Unsupported snapshot version {version} in {path}")
+
+        tasks = []
+        append = tasks.append
+        priorities = list(Priority)
+        unpack_from = _SNAPSHOT_TASK.unpack_from
+        task_size = _SNAPSHOT_TASK.size
+        offset = _SNAPSHOT_HEADER.size
+        try:
+            for _ in range(count):
+                micros, priority, completed, name_length = unpack_from(buffer, offset)
+                offset += task_size
+                name = str(buffer[offset:offset + name_length], "utf-8")
+                offset += name_length
+                append(Task(name, _from_micros(micros), priorities[priority], bool(completed)))
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise JournalFormatError(f"Truncated or corrupt snapshot {path}") from e
+    return generation, tasks
+
+
+class PersistentTodoList:
+    """
+    A TodoList whose changes survive restarts.
+
+    Read through the `todo` attribute; change the list only through the
+    methods here, which mirror TodoList's, so every change is journaled.
+
+    If the journal cannot be written, a change is still applied and queued,
+    and the method raises JournalWriteError: the change is not durable yet.
+
+    Attributes:
+        directory: Where the snapshot and journals live
+        todo: The in-memory list
+        sync_writes: Whether changes wait until their record is durable
+        compact_every: Journal records that trigger a background compaction
+    """
+
+    def __init__(self, directory: str, commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+                 sync_writes: bool = False, compact_every: int = DEFAULT_COMPACT_EVERY,
+                 verbose: bool = False) -> None:
+        self.directory = directory
+        self.sync_writes = sync_writes
+        self.compact_every = compact_every
+        self._commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._compaction_error: Optional[BaseException] = None
+        os.makedirs(directory, exist_ok=True)
+
+        with _gc_paused():
+            first_generation, tasks = load_snapshot(directory)
+            self.todo = TodoList(tasks, verbose=False)  # built in bulk, not task by task
+            del tasks
+        generations = _journal_generations(directory)
+        for generation in generations:
+            if generation < first_generation:
+                os.remove(_journal_path(directory, generation))  # left over from a compaction
+        live = [generation for generation in generations if generation >= first_generation]
+        for position, generation in enumerate(live):
+            replay_journal(_journal_path(directory, generation), self.todo,
+                           is_last=position == len(live) - 1)
+        self.todo.verbose = verbose
+
+        if live and os.path.getsize(_journal_path(directory, live[-1])) == 0:
+            # Nothing was ever committed to it: reuse it rather than leave
+            # an empty generation behind on every restart
+            self._generation = live[-1]
+        else:
+            self._generation = max(live[-1] + 1 if live else 0, first_generation)
+        self._journal = TaskJournal(_journal_path(directory, self._generation), commit_interval)
+
+    def _record(self, record: bytes) -> None:
+        """Journal a change already applied under self._lock."""
+        sequence = self._journal.append(record)
+        journal = self._journal
+        if journal.records >= self.compact_every and self._compactor is None:
+            self._start_compaction()
+        if self.sync_writes:
+            journal.wait(sequence)
+
+    def add_task(self, name: str, due_date: datetime, priority: Priority) -> None:
+        """Add a new task (see TodoList.add_task)."""
+        with self._lock:
+            self.todo.add_task(name, due_date, priority)
+            payload = _ADD.pack(epoch_micros(due_date), priority) + name.strip().encode("utf-8")
+            self._record(_encode(OP_ADD, payload))
+
+    def add_tasks_bulk(self, tasks_data: List[tuple], base_time: Optional[datetime] = None) -> None:
+        """Add (name, timedelta, priority) tasks (see TodoList.add_tasks_bulk)."""
+        if base_time is None:
+            base_time = datetime.now()
+        for name, time_offset, priority in tasks_data:
+            self.add_task(name, base_time + time_offset, priority)
+
+    def complete_task(self, name: str) -> bool:
+        """Complete the first task with this exact name (see TodoList.complete_task)."""
+        with self._lock:
+            found = self.todo.complete_task(name)
+            if found:
+                self._record(_encode(OP_COMPLETE, name.strip().encode("utf-8")))
+            return found
+
+    def remove_task(self, name: str) -> bool:
+        """Remove every task with this exact name (see TodoList.remove_task)."""
+        with self._lock:
+            found = self.todo.remove_task(name)
+            if found:
+                self._record(_encode(OP_REMOVE, name.strip().encode("utf-8")))
+            return found
+
+    def clear_completed_tasks(self) -> int:
+        """Remove all completed tasks (see TodoList.clear_completed_tasks)."""
+        with self._lock:
+            removed = self.todo.clear_completed_tasks()
+            if removed:
+                self._record(_encode(OP_CLEAR_COMPLETED))
+            return removed
+
+    def sort_tasks(self, by_priority: bool = True, by_due_date: bool = False) -> None:
+        """Reorder the list (see TodoList.sort_tasks); the order is persisted too."""
+        with self._lock:
+            self.todo.sort_tasks(by_priority, by_due_date)
+            self._record(_encode(OP_SORT, _SORT.pack(by_priority, by_due_date)))
+
+    def pop_next_task(self) -> Optional[Task]:
+        """Remove and return the next pending task (see TodoList.pop_next_task)."""
+        with self._lock:
+            task = self.todo.pop_next_task()
+            if task is not None:
+                self._record(_encode(OP_POP_NEXT))
+            return task
+
+    def commit(self) -> None:
+        """Make every change so far durable now."""
+        self._journal.commit()
+
+    def _start_compaction(self) -> None:
+        """
+        Rotate the journal and snapshot up to the rotation in the background; needs self._lock.
+
+        The old journal is committed and closed before the new one is opened,
+        so only the newest journal can ever end in a torn record. If that
+        commit fails, nothing is rotated and the error is raised. Nothing is
+        read from the live list: the snapshot is rebuilt from the previous one
+        plus the journals before the new generation, which no longer change.
+        """
+        self._journal.commit()
+        self._journal.close()
+        self._generation += 1
+        self._journal = TaskJournal(_journal_path(self.directory, self._generation),
+                                    self._commit_interval)
+        generation = self._generation
+
+        def run() -> None:
+            try:
+                first_generation, tasks = load_snapshot(self.directory)
+                todo = TodoList(tasks, verbose=False)
+                del tasks
+                for old in _journal_generations(self.directory):
+                    if first_generation <= old < generation:
+                        replay_journal(_journal_path(self.directory, old), todo, is_last=False)
+                write_snapshot(self.directory, generation, snapshot_rows(todo))
+                del todo
+                for old in _journal_generations(self.directory):
+                    if old < generation:
+                        os.remove(_journal_path(self.directory, old))
+                _fsync_directory(self.directory)
+            except BaseException as e:
+                self._compaction_error = e
+            finally:
+                self._compactor = None
+
+        self._compactor = threading.Thread(target=run, name="todo-compaction", daemon=True)
+        self._compactor.start()
+
+    def compact(self, wait: bool = True) -> None:
+        """
+        Snapshot the list now and drop the journals the snapshot covers.
+
+        Args:
+            wait: Block until the snapshot is written
+
+        Raises:
+            Exception: Whatever made the last background compaction fail
+        """
+        with self._lock:
+            compactor = self._compactor
+            if compactor is None:
+                self._start_compaction()
+                compactor = self._compactor
+        if wait and compactor is not None:
+            compactor.join()
+        self._raise_compaction_error()
+
+    def _raise_compaction_error(self) -> None:
+        error, self._compaction_error = self._compaction_error, None
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Commit the journal and wait for any running compaction."""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        self._journal.close()
+        self._raise_compaction_error()
+
+    def __enter__(self) -> "PersistentTodoList":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def main() -> None:
+    """Journal a large list, compact it, and time a restart."""
+    import random
+    import tempfile
+    import time
+
+    task_count = 1_000_000
+    rng = random.Random(5)
+    base = datetime(2026, 10, 18)
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        with PersistentTodoList(directory, compact_every=10 * task_count) as todos:
+            for i in range(task_count):
+                todos.add_task(f"Task {i}", base + timedelta(minutes=rng.randrange(100_000)),
+                               Priority(i % 3))
+            for i in range(0, task_count, 10):
+                todos.complete_task(f"Task {i}")
+        journaled = time.perf_counter() - start
+        print(f"{task_count:,} adds + {task_count // 10:,} completions journaled: {journaled:.2f}s")
+
+        start = time.perf_counter()
+        with PersistentTodoList(directory) as replayed:
+            replay = time.perf_counter() - start
+            expected = replayed.todo.items
+            start = time.perf_counter()
+            replayed.compact()
+            compacted = time.perf_counter() - start
+            for i in range(10_000):
+                replayed.add_task(f"Late {i}", base, Priority.LOW)
+            expected = replayed.todo.items
+        print(f"Restart replaying the journal:          {replay:.2f}s")
+        print(f"Compaction (snapshot written):          {compacted:.2f}s")
+
+        start = time.perf_counter()
+        with PersistentTodoList(directory) as restored:
+            restart = time.perf_counter() - start
+            assert restored.todo.items == expected
+        print(f"Restart from snapshot + 10k-record tail: {restart:.2f}s")
+        print(f"Files: {sorted(os.listdir(directory))}")
+
+
+if __name__ == "__main__":
+    main()